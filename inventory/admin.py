@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import UserProfile, Supplier, Category, Tag, InventoryItem, InventoryMovement, Kit, KitItem
+from .models import UserProfile, Supplier, Category, Tag, InventoryItem, InventoryMovement, Kit, KitItem, StockAlert
 
 # Personaliza el Admin para UserProfile
 class UserProfileAdmin(UserAdmin):
@@ -54,6 +54,13 @@ class KitAdmin(admin.ModelAdmin):
     get_total_items.short_description = "Número de Ítems"
 
 
+@admin.register(StockAlert)
+class StockAlertAdmin(admin.ModelAdmin):
+    list_display = ('item', 'kind', 'created_at', 'dispatched_at', 'resolved_at')
+    list_filter = ('kind',)
+    list_select_related = ('item',)
+
+
 # Registra tus modelos en el panel de administración de Django
 admin.site.register(UserProfile, UserProfileAdmin)
 admin.site.register(Supplier)
@@ -0,0 +1,166 @@
+# backend/inventory/alerts.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('inventory.alerts')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class LoggingAlertSink:
+    """
+    Destino por defecto: escribe cada resumen en el logger 'inventory.alerts'.
+    Un destino es cualquier clase con un método send(alerts) que recibe una
+    lista de StockAlert; se configura con INVENTORY_ALERT_SINK.
+    """
+    def send(self, alerts):
+        logger.warning(format_digest(alerts))
+
+
+class ConsoleAlertSink:
+    """
+    Imprime el resumen en la salida estándar (el comportamiento anterior, pero por lotes).
+    """
+    def send(self, alerts):
+        print(format_digest(alerts))
+
+
+def format_digest(alerts):
+    lines = [f"Resumen de alertas de inventario ({len(alerts)}):"]
+    lines.extend(f"!!! {alert.message}" for alert in alerts)
+    return '\n'.join(lines)
+
+
+def get_sink():
+    return import_string(getattr(settings, 'INVENTORY_ALERT_SINK', 'inventory.alerts.LoggingAlertSink'))()
+
+
+def _alert_messages(item):
+    """
+    Devuelve {tipo: mensaje} con las alertas que corresponden al estado actual del
+    ítem (valores de InventoryItem.objects.with_status()).
+    """
+    messages = {}
+    if item['low_stock']:
+        messages['STOCK_BAJO'] = (
+            f"ALERTA DE STOCK BAJO: El ítem '{item['name']}' tiene {item['quantity']} unidades. "
+            f"El umbral es {item['low_stock_threshold']}."
+        )
+    expiration = item['expiration_date']
+    if item['expired']:
+        messages['VENCIDO'] = f"ALERTA DE VENCIMIENTO: El ítem '{item['name']}' ha VENCIDO el {expiration}."
+    elif item['expiring_soon']:
+        messages['POR_VENCER'] = f"ALERTA DE VENCIMIENTO PROXIMO: El ítem '{item['name']}' vencerá pronto ({expiration})."
+    return messages
+
+
+def enqueue_stock_alerts(item_ids):
+    """
+    Abre o resuelve las alertas de los ítems indicados según su estado actual.
+
+    Es lo único que hace el camino de escritura: una consulta que lee el ítem junto
+    con qué alertas tiene abiertas y, solo si el estado cambió, un INSERT o un UPDATE.
+    Mientras un ítem sigue bajo el umbral no se vuelve a avisar: la restricción
+    única garantiza una sola alerta abierta por ítem y tipo.
+    """
+    from .models import InventoryItem, StockAlert
+
+    item_ids = list(item_ids)
+    if not item_ids:
+        return
+
+    open_alerts = StockAlert.objects.filter(item=OuterRef('pk'), resolved_at__isnull=True)
+    items = InventoryItem.objects.filter(pk__in=item_ids).with_status().annotate(**{
+        f'open_{kind}': Exists(open_alerts.filter(kind=kind)) for kind, _ in StockAlert.KINDS
+    }).values(
+        'pk', 'name', 'quantity', 'low_stock_threshold', 'expiration_date', 'low_stock', 'expired', 'expiring_soon',
+        *(f'open_{kind}' for kind, _ in StockAlert.KINDS)
+    )
+
+    to_create = []
+    to_resolve = []
+    for item in items:
+        messages = _alert_messages(item)
+        for kind, _ in StockAlert.KINDS:
+            is_open = item[f'open_{kind}']
+            if kind in messages and not is_open:
+                to_create.append(StockAlert(item_id=item['pk'], kind=kind, message=messages[kind]))
+            elif kind not in messages and is_open:
+                to_resolve.append((item['pk'], kind))
+
+    if to_resolve:
+        condition = Q()
+        for item_id, kind in to_resolve:
+            condition |= Q(item_id=item_id, kind=kind)
+        StockAlert.objects.filter(condition, resolved_at__isnull=True).update(resolved_at=timezone.now())
+
+    if to_create:
+        # ignore_conflicts: si otra transacción abrió la misma alerta, la restricción la descarta
+        StockAlert.objects.bulk_create(to_create, ignore_conflicts=True)
+        if getattr(settings, 'INVENTORY_ALERTS_MODE', 'thread') == 'thread':
+            transaction.on_commit(lambda: _get_executor().submit(_dispatch_in_thread))
+
+
+def enqueue_expiry_alerts():
+    """
+    Revisa los ítems que vencen dentro de EXPIRING_SOON_DAYS (o ya vencieron); el
+    vencimiento avanza con el calendario aunque no haya movimientos.
+    """
+    from .models import EXPIRING_SOON_DAYS, InventoryItem
+
+    limit = date.today() + timedelta(days=EXPIRING_SOON_DAYS)
+    item_ids = InventoryItem.objects.filter(expiration_date__lte=limit).values_list('pk', flat=True)
+    enqueue_stock_alerts(item_ids.iterator())
+
+
+def dispatch_alerts(sink=None, batch_size=500):
+    """
+    Envía al destino las alertas abiertas pendientes en resúmenes de hasta
+    batch_size alertas y las marca como enviadas. Devuelve cuántas se enviaron.
+    """
+    from .models import StockAlert
+
+    sink = sink or get_sink()
+    sent = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked: varios dispatchers nunca envían la misma alerta (sin efecto en SQLite)
+            pending = list(
+                StockAlert.objects.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+                .filter(dispatched_at__isnull=True, resolved_at__isnull=True)
+                .order_by('created_at', 'pk')[:batch_size]
+            )
+            if not pending:
+                return sent
+            sink.send(pending)
+            StockAlert.objects.filter(pk__in=[alert.pk for alert in pending]).update(dispatched_at=timezone.now())
+        sent += len(pending)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Un solo hilo: los resúmenes se envían en orden y sin duplicados
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stock-alerts')
+        return _executor
+
+
+def _dispatch_in_thread():
+    close_old_connections()
+    try:
+        dispatch_alerts()
+    except Exception:
+        logger.exception("Error al enviar alertas de inventario")
+    finally:
+        connection.close()
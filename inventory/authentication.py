@@ -0,0 +1,143 @@
+# backend/inventory/authentication.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import TokenAuthentication
+
+_CACHE_PREFIX = 'inventory:auth_token:'
+
+
+class _LocalTTLCache:
+    """
+    LRU en memoria del proceso con expiración por entrada. Thread-safe.
+    """
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        max_entries = getattr(settings, 'AUTH_TOKEN_CACHE_MAX_ENTRIES', 1024)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local_cache = _LocalTTLCache()
+
+
+def _cache():
+    """
+    Con AUTH_TOKEN_CACHE_ALIAS se usa ese backend de caché de Django (compartido entre
+    procesos, así la invalidación llega a todos); si no, la LRU local del proceso.
+    """
+    alias = getattr(settings, 'AUTH_TOKEN_CACHE_ALIAS', None)
+    return caches[alias] if alias else _local_cache
+
+
+def token_cache_timeout():
+    """
+    Segundos de vida de una entrada: AUTH_TOKEN_CACHE_TTL con caché compartida y
+    AUTH_TOKEN_CACHE_LOCAL_TTL con la LRU del proceso. Las señales invalidan la
+    entrada en el proceso que hace el cambio; en los demás procesos, sin caché
+    compartida, la revocación tarda a lo más ese tiempo.
+    """
+    if getattr(settings, 'AUTH_TOKEN_CACHE_ALIAS', None):
+        return getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60)
+    return getattr(settings, 'AUTH_TOKEN_CACHE_LOCAL_TTL', 30)
+
+
+def _cache_key(token_key):
+    # No se guarda el token en claro como clave de caché
+    return _CACHE_PREFIX + hashlib.sha256(token_key.encode('utf-8')).hexdigest()
+
+
+def invalidate_token(token_key):
+    _cache().delete(_cache_key(token_key))
+
+
+def invalidate_cached_token(sender, instance, **kwargs):
+    """
+    Receptor de señales: el token se eliminó (logout, rotación o usuario eliminado).
+    """
+    invalidate_token(instance.key)
+
+
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """
+    Receptor de señales: cualquier cambio del usuario (desactivación, cambio de rol)
+    descarta sus tokens cacheados para que la siguiente petición lo relea.
+    Los cambios hechos con QuerySet.update() no disparan señales; esos se reflejan
+    al expirar la entrada (ver token_cache_timeout()).
+    """
+    from rest_framework.authtoken.models import Token
+
+    if kwargs.get('created'):
+        return
+    for token_key in Token.objects.filter(user_id=instance.pk).values_list('key', flat=True):
+        invalidate_token(token_key)
+
+
+def _from_values(model, values):
+    """
+    Instancia con solo los campos indicados ({attname: valor}); el resto queda
+    diferido y se lee de la base de datos si algo lo usa, como con .only().
+    """
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication que guarda lo necesario para autorizar la petición
+    (id del usuario, token, is_active y rol) durante token_cache_timeout() segundos,
+    evitando la consulta authtoken_token ⨝ usuario en cada petición. No se guarda
+    la fila del usuario (hash de la contraseña incluido): en cada petición se arma
+    un usuario con esos campos y los demás diferidos. Los permisos leen request.user.role.
+    """
+    def authenticate_credentials(self, key):
+        timeout = token_cache_timeout()
+        if not timeout:
+            return super().authenticate_credentials(key)
+
+        cache = _cache()
+        cache_key = _cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cached = (user.pk, token.key, user.is_active, user.role)
+            cache.set(cache_key, cached, timeout)
+
+        user_id, token_key, is_active, role = cached
+        user = _from_values(get_user_model(), {'id': user_id, 'is_active': is_active, 'role': role})
+        token = _from_values(self.get_model(), {'key': token_key, 'user_id': user_id})
+        token.user = user
+        return user, token
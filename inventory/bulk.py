@@ -0,0 +1,59 @@
+# backend/inventory/bulk.py
+
+from rest_framework.exceptions import ValidationError
+
+from .alerts import enqueue_stock_alerts
+from .models import InventoryItem, InventoryMovement
+from .serializers import BulkInventoryMovementSerializer
+from .stock import bulk_create_movements
+
+
+def validate_movement_rows(rows):
+    """
+    Valida cada fila con un único serializer hijo (evita instanciar uno por fila)
+    y comprueba la existencia de todos los ítems con una sola consulta.
+    Devuelve (filas_válidas, errores) donde filas_válidas es [(índice, datos)]
+    y errores es {índice: {...}}.
+    """
+    child = BulkInventoryMovementSerializer()
+    valid_rows = []
+    row_errors = {}
+
+    for index, row in enumerate(rows):
+        try:
+            valid_rows.append((index, child.run_validation(row)))
+        except ValidationError as e:
+            row_errors[index] = e.detail
+
+    item_ids = {data['item_id'] for _, data in valid_rows}
+    existing_ids = set(InventoryItem.objects.filter(pk__in=item_ids).values_list('pk', flat=True))
+    for index, data in valid_rows:
+        if data['item_id'] not in existing_ids:
+            row_errors[index] = {'item': [f"El ítem {data['item_id']} no existe."]}
+
+    valid_rows = [(index, data) for index, data in valid_rows if index not in row_errors]
+    return valid_rows, row_errors
+
+
+def ingest_movements(rows, moved_by=None, partial=False):
+    """
+    Valida e inserta una lista de movimientos (diccionarios) en una sola transacción,
+    actualizando el stock una vez por ítem.
+
+    Devuelve un diccionario con el número de movimientos creados, los ítems
+    afectados y los errores por fila ({'row': índice, 'errors': {...}}).
+    Si hay errores y partial es False no se inserta nada; con partial=True se
+    insertan las filas válidas y se informan las demás.
+    """
+    valid_rows, row_errors = validate_movement_rows(rows)
+
+    errors = [{'row': index, 'errors': row_errors[index]} for index in sorted(row_errors)]
+    if errors and not partial:
+        return {'created': 0, 'items_updated': 0, 'errors': errors}
+
+    movements = [InventoryMovement(moved_by=moved_by, **data) for _, data in valid_rows]
+    deltas = bulk_create_movements(movements)
+
+    enqueue_stock_alerts(deltas)
+
+    return {'created': len(movements), 'items_updated': len(deltas), 'errors': errors}
@@ -0,0 +1,70 @@
+# backend/inventory/conditional.py
+
+import hashlib
+from datetime import date
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .report_cache import data_generation
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / Last-Modified) para list y retrieve de un ModelViewSet.
+
+    Los validadores se calculan antes de serializar:
+    - Listado: una consulta agregada sobre el queryset ya filtrado, con el máximo
+      de `watermark_field`, el último id y el número de filas (cubre altas, bajas
+      y escrituras hechas con QuerySet.update(), como las del motor de stock).
+    - Detalle: `watermark_field` de la fila obtenida con get_object().
+    Last-Modified solo se envía en el detalle: en un listado el máximo de
+    updated_at no cambia al eliminar una fila, así que se revalida solo con el ETag.
+    Ambos incluyen la versión de los datos de report_cache (fila de DataVersion,
+    compartida por todos los procesos), que las señales incrementan ante cambios
+    que no mueven la marca de agua (renombrar una categoría, eliminar una fila),
+    la ruta con su query string y el formato. Si el cliente ya tiene esa versión
+    (If-None-Match / If-Modified-Since) se responde 304 sin serializar nada.
+    """
+    watermark_field = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        marks = queryset.order_by().aggregate(last=Max(self.watermark_field), last_id=Max('pk'), total=Count('pk'))
+        return self.conditional_get(
+            request, (marks['last'], marks['last_id'], marks['total']), None,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        modified = getattr(instance, self.watermark_field)
+        return self.conditional_get(
+            request, (instance.pk, modified), modified,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def conditional_get(self, request, marks, modified, build):
+        generation, changed_at = data_generation()
+        # La fecha del día se incluye porque los estados de vencimiento dependen de 'hoy'
+        raw = '|'.join(str(part) for part in (
+            request.get_full_path(), request.accepted_renderer.format, date.today(), generation, *marks,
+        ))
+        etag = '"' + hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32] + '"'
+        last_modified = None
+        if modified is not None:
+            # La fila puede mostrar nombres de otras tablas: cuenta también el último cambio señalado
+            last_modified = int(max(modified.timestamp(), changed_at or 0))
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = build()
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # El cliente debe revalidar siempre antes de reutilizar su copia
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,221 @@
+# backend/inventory/exports.py
+
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .streaming import STREAM_CHUNK_SIZE
+
+# --- Columnas de cada exportación ---
+# Solo se leen de la base de datos las columnas que aparecen en el archivo.
+
+ITEM_EXPORT_HEADERS = ['Nombre', 'N° Serie', 'Cantidad', 'Umbral', 'Categoría', 'Proveedor', 'Fecha Venc.', 'Estado Stock', 'Estado Venc.']
+ITEM_EXPORT_FIELDS = ['name', 'serial_number', 'quantity', 'low_stock_threshold', 'category__name', 'supplier__name', 'expiration_date']
+
+MOVEMENT_EXPORT_HEADERS = ['Ítem', 'Tipo Mov.', 'Cantidad', 'Realizado por', 'Fecha y Hora', 'Proyecto', 'Notas']
+MOVEMENT_EXPORT_FIELDS = ['item__name', 'movement_type', 'quantity', 'moved_by__username', 'movement_date', 'project', 'notes']
+
+STOCK_AS_OF_EXPORT_HEADERS = ['Ítem', 'Nombre', 'Fecha', 'Cantidad']
+
+VALUATION_EXPORT_HEADERS = ['Ítem', 'Nombre', 'Categoría', 'Proveedor', 'Cantidad', 'Costo Unitario', 'Valor', 'Cantidad sin Costo']
+
+
+def item_export_rows(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Filas de los reportes de ítems (mismas columnas que el PDF) leídas con values_list.
+    El queryset debe venir de InventoryItem.objects.with_status(): los estados se leen anotados.
+    """
+    for name, serial, quantity, threshold, category, supplier, expiration, low_stock, expired, expiring_soon in (
+        queryset.prefetch_related(None)
+        .values_list(*ITEM_EXPORT_FIELDS, 'low_stock', 'expired', 'expiring_soon')
+        .iterator(chunk_size=chunk_size)
+    ):
+        if expired:
+            expiry_status = 'VENCIDO'
+        elif expiring_soon:
+            expiry_status = 'Por Vencer'
+        else:
+            expiry_status = 'Vigente'
+        yield (
+            name, serial, quantity, threshold, category, supplier, expiration,
+            'Bajo' if low_stock else 'Normal', expiry_status,
+        )
+
+
+def movement_export_rows(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Filas del historial de movimientos leídas con values_list (sin instanciar modelos).
+    """
+    for item_name, movement_type, quantity, username, movement_date, project, notes in (
+        queryset.values_list(*MOVEMENT_EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    ):
+        yield (item_name, movement_type, quantity, username, timezone.localtime(movement_date), project, notes)
+
+
+# --- CSV ---
+
+class _Echo:
+    """
+    Objeto tipo archivo que devuelve lo escrito, para usar csv.writer en un generador.
+    """
+    def write(self, value):
+        return value
+
+
+# Texto que Excel / LibreOffice interpretarían como fórmula (inyección de fórmulas)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        # Texto de usuario (nombres, notas): el apóstrofo lo deja como texto literal
+        return "'" + value
+    return value
+
+
+def iter_csv(headers, rows):
+    writer = csv.writer(_Echo())
+    # BOM para que Excel reconozca el archivo como UTF-8
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+# --- XLSX ---
+# Un .xlsx es un zip de XML. Se escribe con zipfile sobre un búfer que se vacía
+# a medida que se generan filas, así el archivo se envía mientras se construye.
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+# Estilos: 0 = general, 1 = encabezado en negrita, 2 = fecha, 3 = fecha y hora
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/><numFmt numFmtId="165" formatCode="dd/mm/yyyy hh:mm"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+# Caracteres que XML 1.0 no admite: un texto con ellos dejaría el archivo ilegible
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+class _DrainBuffer:
+    """
+    Búfer de solo escritura (no seekable) que entrega lo acumulado al vaciarlo.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _xlsx_text(value):
+    return escape(_XML_ILLEGAL.sub('', str(value)))
+
+
+def _xlsx_cell(value, header=False):
+    if value is None or value == '':
+        return '<c/>'
+    if header:
+        return f'<c t="inlineStr" s="1"><is><t>{_xlsx_text(value)}</t></is></c>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        value = timezone.make_naive(value) if timezone.is_aware(value) else value
+        serial = (value - _EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c s="3"><v>{serial:.6f}</v></c>'
+    if isinstance(value, date):
+        return f'<c s="2"><v>{(value - _EXCEL_EPOCH.date()).days}</v></c>'
+    # Las celdas inlineStr son siempre texto: Excel no evalúa fórmulas en ellas
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{_xlsx_text(value)}</t></is></c>'
+
+
+def _xlsx_row(values, header=False):
+    return '<row>' + ''.join(_xlsx_cell(value, header) for value in values) + '</row>'
+
+
+def iter_xlsx(headers, rows, sheet_name='Reporte', flush_every=500):
+    buffer = _DrainBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        archive.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        archive.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        archive.writestr('xl/styles.xml', _XLSX_STYLES)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(headers, header=True).encode('utf-8'))
+            pending = []
+            for row in rows:
+                pending.append(_xlsx_row(row))
+                if len(pending) >= flush_every:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            sheet.write(''.join(pending).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
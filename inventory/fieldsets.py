@@ -0,0 +1,162 @@
+# backend/inventory/fieldsets.py
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+# Campos a pedido en las respuestas de la API:
+#   ?fields=id,name,quantity   solo esos campos
+#   ?omit=description          todos menos esos
+#   ?expand=category,tags      el objeto relacionado completo en lugar de su id
+# Los campos expandibles se declaran en Meta.expandable_fields del serializer:
+# {campo: (serializer, kwargs)}. Sin estos parámetros la respuesta no cambia.
+#
+# Las vistas con FieldsetViewMixin además ajustan el queryset a los campos
+# pedidos: .only() con las columnas necesarias y solo los select_related /
+# prefetch_related que esos campos usan.
+
+
+def _names(raw):
+    return [name.strip() for name in raw.split(',') if name.strip()]
+
+
+class Fieldset:
+    """
+    Selección de campos de una petición (?fields=, ?omit=, ?expand=).
+    """
+    def __init__(self, fields=None, omit=(), expand=()):
+        self.fields = fields
+        self.omit = set(omit)
+        self.expand = list(expand)
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        El Fieldset de la query, o None si no trae ninguno de los parámetros.
+        """
+        params = request.query_params
+        if not any(params.get(name) for name in ('fields', 'omit', 'expand')):
+            return None
+        fields = params.get('fields')
+        return cls(
+            fields=_names(fields) if fields else None,
+            omit=_names(params.get('omit', '')),
+            expand=_names(params.get('expand', '')),
+        )
+
+    def select(self, serializer, fields):
+        """
+        Aplica la selección a los campos (dict nombre → campo) de `serializer`.
+        Nombres desconocidos responden 400.
+        """
+        expandable = getattr(serializer.Meta, 'expandable_fields', {})
+        unknown = [name for name in self.expand if name not in expandable]
+        if unknown:
+            raise ValidationError({'expand': [f"No se puede expandir: {', '.join(unknown)}. Opciones: {', '.join(expandable) or 'ninguna'}."]})
+        for name in self.expand:
+            nested_class, kwargs = expandable[name]
+            fields[name] = nested_class(read_only=True, **kwargs)
+
+        for param, names in (('fields', self.fields or ()), ('omit', self.omit)):
+            unknown = [name for name in names if name not in fields]
+            if unknown:
+                raise ValidationError({param: [f"Campos desconocidos: {', '.join(unknown)}."]})
+
+        if self.fields is not None:
+            wanted = set(self.fields)
+            fields = {name: field for name, field in fields.items() if name in wanted}
+        return {name: field for name, field in fields.items() if name not in self.omit}
+
+
+class FieldsetSerializerMixin:
+    """
+    Aplica el Fieldset de context['fieldset'] al serializer principal (no a los
+    anidados, que comparten el mismo contexto).
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        if fieldset is None:
+            return fields
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+        return fieldset.select(self, fields)
+
+
+def fieldset_queryset(queryset, serializer, keep=()):
+    """
+    Ajusta el queryset a los campos de `serializer`: .only() con sus columnas
+    (más `keep`) y solo las relaciones que esos campos leen. Si algún campo tiene
+    dependencias desconocidas (SerializerMethodField que no está en
+    Meta.values_sources) se conservan todas las columnas, pero igual se quitan
+    las relaciones sin uso.
+    """
+    values_sources = getattr(serializer.Meta, 'values_sources', {})
+    columns, select, prefetch = {'pk', *keep}, set(), set()
+    restrict_columns = True
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, (ManyRelatedField, ListSerializer)):
+            prefetch.add(field.source)
+        elif field.source == '*':
+            # Las anotaciones de Meta.values_sources no necesitan columnas
+            restrict_columns = restrict_columns and name in values_sources
+        elif isinstance(field, BaseSerializer):
+            # Relación expandida: JOIN con select_related y las columnas de su serializer
+            select.add(field.source)
+            columns.add(field.source)
+            columns.update(f'{field.source}__{child.source}' for child in field.fields.values() if child.source != '*')
+        elif '.' in field.source:
+            # "relación.campo": JOIN con select_related
+            path = field.source.split('.')
+            select.add(path[0])
+            columns.update((path[0], '__'.join(path)))
+        else:
+            columns.add(field.source)
+
+    # Se conservan los Prefetch de la vista (p. ej. con su propio select_related)
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if getattr(lookup, 'prefetch_to', lookup).split('__')[0] in prefetch
+    ]
+    covered = {getattr(lookup, 'prefetch_to', lookup).split('__')[0] for lookup in lookups}
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*lookups, *sorted(prefetch - covered))
+    if restrict_columns:
+        queryset = queryset.only(*columns)
+    return queryset
+
+
+class FieldsetViewMixin:
+    """
+    ?fields= / ?omit= / ?expand= en las acciones de `fieldset_actions`: el
+    serializer recibe el Fieldset en su contexto y get_queryset() se ajusta a los
+    campos pedidos. `watermark_field` (ConditionalGetMixin) siempre se carga.
+    """
+    fieldset_actions = ('list', 'retrieve')
+
+    def get_fieldset(self):
+        if getattr(self, 'action', None) not in self.fieldset_actions:
+            return None
+        return Fieldset.from_request(self.request)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            context['fieldset'] = fieldset
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_fieldset() is None:
+            return queryset
+        keep = [self.watermark_field] if getattr(self, 'watermark_field', None) else []
+        return fieldset_queryset(queryset, self.get_serializer(), keep)
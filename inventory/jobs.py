@@ -0,0 +1,201 @@
+# backend/inventory/jobs.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from rest_framework.request import Request
+
+from .models import ReportJob
+from .renderers import FastJSONRenderer
+
+REPORT_JOB_TYPES = ('current_stock', 'low_stock', 'expiring_soon', 'movement_history', 'stock_as_of', 'valuation')
+REPORT_JOB_FORMATS = ('json', 'ndjson', 'pdf', 'csv', 'xlsx')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPORT_JOBS_WORKERS', 2),
+                thread_name_prefix='report-job',
+            )
+        return _executor
+
+
+def artifacts_dir():
+    path = getattr(settings, 'REPORT_JOBS_DIR', os.path.join(settings.BASE_DIR, 'report_artifacts'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def artifact_path(job):
+    return os.path.join(artifacts_dir(), job.artifact)
+
+
+def create_report_job(user, report_type, report_format, params=None):
+    """
+    Registra un trabajo de reporte y, en modo 'thread', lo envía al pool de hilos
+    cuando la transacción se confirma. En modo 'command' queda pendiente para
+    el comando run_report_worker.
+    """
+    purge_expired_jobs()
+    job = ReportJob.objects.create(
+        report_type=report_type,
+        report_format=report_format,
+        params=params or {},
+        requested_by=user if user and user.is_authenticated else None,
+    )
+    if getattr(settings, 'REPORT_JOBS_MODE', 'thread') == 'thread':
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.pk))
+    return job
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_report_job(job_id)
+    finally:
+        connection.close()
+
+
+def claim_job(job_id):
+    """
+    Marca el trabajo como EN_PROCESO solo si sigue PENDIENTE; así dos workers
+    nunca procesan el mismo trabajo.
+    """
+    return ReportJob.objects.filter(pk=job_id, status='PENDIENTE').update(
+        status='EN_PROCESO', started_at=timezone.now()
+    ) == 1
+
+
+def claim_next_job():
+    """
+    Toma el trabajo pendiente más antiguo. Devuelve su id o None.
+    """
+    for job_id in ReportJob.objects.filter(status='PENDIENTE').order_by('created_at').values_list('pk', flat=True)[:10]:
+        if claim_job(job_id):
+            return job_id
+    return None
+
+
+def run_report_job(job_id, claimed=False):
+    """
+    Genera el archivo del trabajo en REPORT_JOBS_DIR y actualiza su estado.
+    """
+    if not claimed and not claim_job(job_id):
+        return
+    job = ReportJob.objects.select_related('requested_by').get(pk=job_id)
+
+    filename = f"{job.pk}_{job.report_type}.{job.report_format}"
+    final_path = os.path.join(artifacts_dir(), filename)
+    tmp_path = final_path + '.tmp'
+    try:
+        response = _render_report(job)
+        if response.status_code >= 400:
+            raise RuntimeError(_error_message(response))
+
+        content_type = response.get('Content-Type', '')
+        with open(tmp_path, 'wb') as f:
+            if response.streaming:
+                for chunk in response.streaming_content:
+                    f.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+            elif isinstance(response.data, (bytes, bytearray)):
+                f.write(response.data)
+                content_type = 'application/pdf'
+            else:
+                f.write(FastJSONRenderer().render(response.data))
+                content_type = 'application/json'
+        os.replace(tmp_path, final_path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        ReportJob.objects.filter(pk=job.pk).update(status='FALLIDO', error=str(e), finished_at=timezone.now())
+        return
+
+    now = timezone.now()
+    ReportJob.objects.filter(pk=job.pk).update(
+        status='COMPLETADO',
+        artifact=filename,
+        content_type=content_type,
+        size=os.path.getsize(final_path),
+        finished_at=now,
+        expires_at=now + timedelta(hours=getattr(settings, 'REPORT_JOBS_TTL_HOURS', 24)),
+    )
+
+
+def _render_report(job):
+    """
+    Ejecuta InventoryReportView.build_report con los parámetros guardados en el trabajo,
+    de modo que el archivo sea idéntico al que devolvería la petición síncrona.
+    """
+    from .reports_views import InventoryReportView
+
+    query = QueryDict(mutable=True)
+    for key, value in (job.params or {}).items():
+        query[key] = str(value)
+    query['report_type'] = job.report_type
+    query['format'] = job.report_format
+    query.pop('async', None)
+
+    http_request = HttpRequest()
+    http_request.method = 'GET'
+    http_request.GET = query
+    request = Request(http_request)
+    request.user = job.requested_by
+
+    view = InventoryReportView()
+    view.request = request
+    view.format_kwarg = None
+    return view.build_report(request)
+
+
+def _error_message(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict) and 'error' in data:
+        return str(data['error'])
+    return f"HTTP {response.status_code}"
+
+
+def fail_stale_jobs():
+    """
+    Marca como FALLIDO los trabajos EN_PROCESO desde hace más de
+    REPORT_JOBS_STALE_MINUTES: el proceso que los generaba terminó sin cerrarlos
+    (reinicio, caída), y de otro modo el cliente esperaría para siempre. No se
+    reencolan, porque en modo 'thread' nadie los volvería a tomar y un reporte que
+    hace caer al worker lo haría de nuevo; el cliente puede volver a solicitarlo.
+    """
+    minutes = getattr(settings, 'REPORT_JOBS_STALE_MINUTES', 30)
+    now = timezone.now()
+    return ReportJob.objects.filter(status='EN_PROCESO', started_at__lte=now - timedelta(minutes=minutes)).update(
+        status='FALLIDO',
+        error="El trabajo se interrumpió antes de terminar. Vuelva a solicitar el reporte.",
+        finished_at=now,
+    )
+
+
+def purge_expired_jobs():
+    """
+    Elimina los archivos de los trabajos vencidos y los marca como EXPIRADO.
+    También cierra los trabajos interrumpidos (fail_stale_jobs).
+    """
+    fail_stale_jobs()
+    expired = ReportJob.objects.filter(status='COMPLETADO', expires_at__lte=timezone.now())
+    count = 0
+    for job in expired.only('pk', 'artifact'):
+        if job.artifact:
+            try:
+                os.remove(artifact_path(job))
+            except FileNotFoundError:
+                pass
+        count += ReportJob.objects.filter(pk=job.pk, status='COMPLETADO').update(status='EXPIRADO', artifact='')
+    return count
@@ -0,0 +1,178 @@
+# backend/inventory/kits.py
+
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import DecimalField, F, Min, Value, Window
+from django.db.models.functions import Floor, Greatest, NullIf
+
+KIT_BOM_VERSION_KEY = 'inventory:kit_bom_version'
+
+_quantity_field = DecimalField(max_digits=20, decimal_places=2)
+
+
+def _cache():
+    return caches[getattr(settings, 'KIT_AVAILABILITY_CACHE_ALIAS', 'default')]
+
+
+def bump_kit_version(**kwargs):
+    """
+    Receptor de señales: la composición de algún kit cambió (Kit/KitItem).
+    Los cambios de stock ya se reflejan en _stock_watermark().
+    """
+    cache = _cache()
+    try:
+        cache.incr(KIT_BOM_VERSION_KEY)
+    except ValueError:
+        cache.set(KIT_BOM_VERSION_KEY, 1, None)
+
+
+def _availability_rows():
+    """
+    Una sola consulta: una fila por componente (o una por kit vacío) con la
+    cantidad requerida, la disponible, cuántos kits alcanza ese componente y,
+    con una función ventana MIN por kit, cuántos kits se pueden armar.
+    """
+    from .models import Kit
+
+    component_buildable = Greatest(
+        Floor(F('kititem__item__quantity') / NullIf(F('kititem__quantity'), Value(0)), output_field=_quantity_field),
+        Value(0), output_field=_quantity_field,
+    )
+    return (
+        Kit.objects.annotate(component_buildable=component_buildable)
+        .annotate(kit_buildable=Window(Min('component_buildable'), partition_by=F('pk')))
+        .values_list(
+            'pk', 'name', 'kititem__item_id', 'kititem__item__name',
+            'kititem__quantity', 'kititem__item__quantity', 'component_buildable', 'kit_buildable',
+        )
+        .order_by('name', 'pk', 'kititem__item__name', 'kititem__item_id')
+    )
+
+
+def compute_kit_availability(target=None):
+    """
+    Devuelve, para cada kit, cuántas unidades se pueden armar con el stock actual,
+    el componente que lo limita y el faltante de cada componente para armar
+    `target` unidades (por defecto, una más de las que se pueden armar).
+    """
+    kits = []
+    current = None
+    for kit_id, kit_name, item_id, item_name, required, available, component_buildable, kit_buildable in _availability_rows():
+        if current is None or current['kit'] != kit_id:
+            buildable = int(kit_buildable) if kit_buildable is not None else 0
+            current = {
+                'kit': kit_id,
+                'kit_name': kit_name,
+                'buildable': buildable,
+                'target': target if target is not None else buildable + 1,
+                'limiting_component': None,
+                'components': [],
+            }
+            kits.append(current)
+        if item_id is None:
+            continue
+
+        component_buildable = int(component_buildable) if component_buildable is not None else 0
+        needed = required * current['target']
+        current['components'].append({
+            'item': item_id,
+            'item_name': item_name,
+            'required': required,
+            'available': available,
+            'buildable': component_buildable,
+            'shortfall': max(needed - available, Decimal('0')),
+        })
+        if current['limiting_component'] is None and component_buildable == current['buildable']:
+            current['limiting_component'] = {'item': item_id, 'item_name': item_name}
+
+    return kits
+
+
+def _stock_watermark():
+    """
+    Último updated_at de los ítems (índice inv_item_updated_idx): el motor de stock
+    lo actualiza con cada movimiento, y eliminar un componente elimina su KitItem.
+    """
+    from .models import InventoryItem
+
+    return InventoryItem.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+
+
+def kit_availability(target=None):
+    """
+    compute_kit_availability con caché. La clave incluye la marca de agua del stock
+    y la generación de composición de kits, así que cualquier movimiento o cambio
+    de un kit invalida el resultado sin recorrerlo.
+    """
+    cache = _cache()
+    raw = f"{_stock_watermark()}|{cache.get(KIT_BOM_VERSION_KEY, 0)}|{target}"
+    key = 'inventory:kit_availability:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    result = cache.get(key)
+    if result is None:
+        result = compute_kit_availability(target)
+        cache.set(key, result, getattr(settings, 'KIT_AVAILABILITY_CACHE_TIMEOUT', 300))
+    return result
+
+
+# Tipo de movimiento que se registra por componente en cada operación
+KIT_OPERATIONS = {
+    'assemble': 'SALIDA',       # Armar: se consumen los componentes
+    'disassemble': 'DEVOLUCION', # Desarmar: los componentes vuelven al stock
+}
+
+
+def assemble_kit(kit, units, operation='assemble', project=None, notes=None, moved_by=None):
+    """
+    Arma (o desarma) `units` unidades de un kit en una sola transacción: bloquea
+    las filas de los componentes, valida que alcance el stock de todos, inserta
+    un movimiento por componente con bulk_create y aplica las variaciones una vez
+    por ítem. Si algún componente no alcanza se lanza InsufficientStockError y no
+    se registra nada. Devuelve un resumen de la operación.
+    """
+    from .alerts import enqueue_stock_alerts
+    from .models import InventoryItem, InventoryMovement, KitItem
+    from .stock import bulk_create_movements
+
+    movement_type = KIT_OPERATIONS[operation]
+    lines = list(KitItem.objects.filter(kit=kit).values_list('item_id', 'quantity').order_by('item_id'))
+    if not lines:
+        raise ValueError("El kit no tiene componentes.")
+
+    movements = [
+        InventoryMovement(
+            item_id=item_id, movement_type=movement_type, quantity=quantity * units,
+            moved_by=moved_by, project=project,
+            notes=notes or f"{'Armado' if operation == 'assemble' else 'Desarmado'} de {units} x {kit.name}",
+        )
+        for item_id, quantity in lines
+    ]
+    with transaction.atomic():
+        deltas = bulk_create_movements(movements, lock=True, reject_negative=operation == 'assemble')
+        enqueue_stock_alerts(deltas)
+        items = {
+            pk: (name, quantity)
+            for pk, name, quantity in InventoryItem.objects.filter(pk__in=deltas).values_list('pk', 'name', 'quantity')
+        }
+    return {
+        'kit': kit.pk,
+        'kit_name': kit.name,
+        'operation': operation,
+        'units': units,
+        'project': project,
+        'movements_created': len(movements),
+        'components': [
+            {
+                'item': movement.item_id,
+                'item_name': items[movement.item_id][0],
+                'movement': movement.pk,
+                'movement_type': movement_type,
+                'quantity': movement.quantity,
+                'remaining': items[movement.item_id][1],
+            }
+            for movement in movements
+        ],
+    }
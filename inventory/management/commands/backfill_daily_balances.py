@@ -0,0 +1,16 @@
+# backend/inventory/management/commands/backfill_daily_balances.py
+
+from django.core.management.base import BaseCommand
+
+from inventory.snapshots import rebuild_daily_balances
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los saldos diarios de stock (DailyStockBalance) a partir del historial de movimientos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--item', type=int, action='append', dest='items', help="Reconstruir solo este ítem (repetible)")
+
+    def handle(self, *args, **options):
+        created = rebuild_daily_balances(options['items'])
+        self.stdout.write(self.style.SUCCESS(f"{created} saldos diarios generados."))
@@ -0,0 +1,219 @@
+# backend/inventory/management/commands/benchmark_endpoints.py
+
+import json
+import math
+import platform
+import statistics
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.jobs import REPORT_JOB_FORMATS, REPORT_JOB_TYPES
+from inventory.models import (
+    Category, DailyStockBalance, InventoryItem, InventoryMovement, Kit, PurchaseRecord, Supplier, Tag, UserProfile,
+)
+from inventory.renderers import orjson
+from inventory.urls import router
+
+
+class _Rollback(Exception):
+    pass
+
+
+# Parámetros que necesitan las acciones extra de los viewsets
+ACTION_PARAMS = {
+    'search': lambda: {'q': 'perno'},
+    'stock_as_of': lambda: {'date': timezone.localdate().isoformat()},
+}
+
+DATASET_MODELS = (
+    UserProfile, Category, Supplier, Tag, InventoryItem, Kit, InventoryMovement, PurchaseRecord, DailyStockBalance,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia, rendimiento y número de consultas de cada endpoint del router y de cada "
+        "report_type/formato de /api/reports/, y escribe los resultados en JSON para comparar corridas "
+        "(--baseline). Usa un usuario ADMIN temporal en una transacción que se revierte. Vacía las "
+        "cachés configuradas antes de cada petición (salvo --warm): úsese con una base y caché de pruebas, "
+        "p. ej. la generada por seed_benchmark_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help="Peticiones por endpoint")
+        parser.add_argument('--output', default='benchmark_endpoints.json', help="Archivo JSON de resultados ('-' para no escribirlo)")
+        parser.add_argument('--baseline', help="Resultados JSON de una corrida anterior para comparar")
+        parser.add_argument('--only', action='append', help="Medir solo los casos cuyo nombre contiene este texto (repetible)")
+        parser.add_argument('--history-days', type=int, default=30, help="Días del reporte movement_history")
+        parser.add_argument('--warm', action='store_true', help="No vaciar las cachés entre peticiones")
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat debe ser mayor que 0.")
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = {result['name']: result for result in json.load(f)['results']}
+
+        results = []
+        try:
+            with transaction.atomic():
+                user = UserProfile.objects.create_user('benchmark_endpoints', role='ADMIN')
+                client = APIClient(SERVER_NAME=self.server_name())
+                client.raise_request_exception = False # Un error se registra como 500
+                client.force_authenticate(user)
+
+                cases = self.cases(options['history_days'])
+                if options['only']:
+                    cases = [case for case in cases if any(text in case[0] for text in options['only'])]
+                for name, url, params in cases:
+                    result = self.measure(client, name, url, params, options['repeat'], options['warm'])
+                    results.append(result)
+                    self.write_result(result, baseline)
+                dataset = {model._meta.label: model.objects.count() for model in DATASET_MODELS}
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        document = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'orjson': orjson is not None,
+                'repeat': options['repeat'],
+                'warm': options['warm'],
+                'history_days': options['history_days'],
+                'dataset': dataset,
+            },
+            'results': results,
+        }
+        if options['output'] != '-':
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(document, f, ensure_ascii=False, indent=2, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"{len(results)} casos escritos en {options['output']}."))
+
+    def server_name(self):
+        # El cliente de pruebas usa 'testserver', que ALLOWED_HOSTS rechaza fuera de los tests
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        return hosts[0] if hosts else 'localhost'
+
+    def cases(self, history_days):
+        """
+        (nombre, url, parámetros) de cada caso. Los nombres son estables entre
+        corridas: la URL de router y la combinación de reporte y formato.
+        """
+        cases = []
+        for _prefix, viewset, basename in router.registry:
+            first = viewset.queryset.model.objects.order_by('pk').values_list('pk', flat=True).first()
+            cases.append((f'{basename}-list', reverse(f'{basename}-list'), {}))
+            if first is not None:
+                cases.append((f'{basename}-detail', reverse(f'{basename}-detail', args=[first]), {}))
+            for action in viewset.get_extra_actions():
+                if 'get' not in action.mapping or (action.detail and first is None):
+                    continue
+                name = f'{basename}-{action.url_name}'
+                url = reverse(name, args=[first] if action.detail else [])
+                cases.append((name, url, ACTION_PARAMS.get(action.__name__, dict)()))
+
+        today = timezone.localdate()
+        report_params = {
+            'movement_history': {'start_date': (today - timedelta(days=history_days)).isoformat()},
+            'stock_as_of': {'date': (today - timedelta(days=30)).isoformat()},
+        }
+        reports = reverse('inventory-reports')
+        for report_type in REPORT_JOB_TYPES:
+            for report_format in REPORT_JOB_FORMATS:
+                params = {'report_type': report_type, 'format': report_format, **report_params.get(report_type, {})}
+                cases.append((f'report-{report_type}-{report_format}', reports, params))
+        cases.append((
+            'report-movement_history-json-stream', reports,
+            {'report_type': 'movement_history', 'format': 'json', 'stream': 'true', **report_params['movement_history']},
+        ))
+        cases.append(('report-valuation-json-fifo', reports, {'report_type': 'valuation', 'method': 'fifo'}))
+        return cases
+
+    def measure(self, client, name, url, params, repeat, warm):
+        latencies, queries = [], []
+        for _ in range(repeat):
+            if not warm:
+                for alias in settings.CACHES:
+                    caches[alias].clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url, params)
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                latencies.append(time.perf_counter() - start)
+            queries.append(len(captured.captured_queries))
+
+        latencies.sort()
+        median = statistics.median(latencies)
+        rows = self.count_rows(response, content)
+        return {
+            'name': name,
+            'path': url,
+            'params': params,
+            'status': response.status_code,
+            'queries': queries[-1],
+            'queries_first': queries[0],
+            'latency_ms': {
+                'min': round(latencies[0] * 1000, 3),
+                'median': round(median * 1000, 3),
+                'p95': round(latencies[math.ceil(0.95 * len(latencies)) - 1] * 1000, 3),
+                'max': round(latencies[-1] * 1000, 3),
+                'mean': round(statistics.fmean(latencies) * 1000, 3),
+            },
+            'bytes': len(content),
+            'rows': rows,
+            'rows_per_s': round(rows / median, 1) if rows is not None and median else None,
+            'mb_per_s': round(len(content) / 1024 / 1024 / median, 3) if median else None,
+        }
+
+    def count_rows(self, response, content):
+        """
+        Filas de la respuesta (listados, reportes JSON/NDJSON/CSV), o None si no aplica (PDF, XLSX).
+        """
+        content_type = response.get('Content-Type', '')
+        if response.status_code != 200:
+            return None
+        if 'ndjson' in content_type and response.streaming:
+            # Sin streaming (reportes de ítems) el NDJSON es el sobre JSON en una línea
+            return content.count(b'\n')
+        if content_type.startswith('text/csv'):
+            return max(content.count(b'\n') - 1, 0)
+        if 'json' not in content_type:
+            return None
+        data = json.loads(content)
+        if isinstance(data, dict):
+            for key in ('results', 'data'):
+                if isinstance(data.get(key), list):
+                    return len(data[key])
+            if isinstance(data.get('data'), dict) and isinstance(data['data'].get('items'), list):
+                return len(data['data']['items'])
+            return 1
+        return len(data) if isinstance(data, list) else 1
+
+    def write_result(self, result, baseline):
+        latency = result['latency_ms']
+        line = (
+            f"{result['name']:<45} {result['status']:>3}  mediana {latency['median']:9.1f} ms  "
+            f"p95 {latency['p95']:9.1f} ms  {result['queries']:>4} consultas  {result['bytes'] / 1024:9.1f} KB"
+        )
+        previous = (baseline or {}).get(result['name'])
+        if previous:
+            before = previous['latency_ms']['median']
+            change = (latency['median'] - before) / before * 100 if before else 0
+            line += f"  | antes {before:9.1f} ms ({change:+.0f} %), {previous['queries']} consultas"
+        self.stdout.write(line)
@@ -0,0 +1,73 @@
+# backend/inventory/management/commands/benchmark_exports.py
+
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from inventory.models import InventoryItem, UserProfile
+from inventory.reports_views import InventoryReportView
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo y la memoria de las exportaciones del reporte current_stock "
+        "(CSV, XLSX y PDF) sobre ítems sintéticos. Los datos se crean en una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--formats', default='csv,xlsx,pdf')
+        parser.add_argument('--memory', action='store_true', help="Medir el pico de memoria con tracemalloc (más lento)")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = UserProfile.objects.create_user('benchmark_exports', role='AUDITOR')
+                InventoryItem.objects.bulk_create(
+                    (
+                        InventoryItem(
+                            name=f"Ítem de prueba {i:06d}", serial_number=f"BENCH-{i:06d}",
+                            quantity=Decimal(i % 200), low_stock_threshold=Decimal('5'),
+                        )
+                        for i in range(options['rows'])
+                    ),
+                    batch_size=2000,
+                )
+                for report_format in options['formats'].split(','):
+                    self.measure(user, report_format.strip(), options['rows'], options['memory'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def measure(self, user, report_format, rows, memory):
+        factory = APIRequestFactory()
+        request = factory.get('/api/reports/', {'report_type': 'current_stock', 'format': report_format})
+        force_authenticate(request, user=user)
+
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        response = InventoryReportView.as_view()(request)
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            response.render()
+            size = len(response.content)
+        elapsed = time.perf_counter() - start
+        line = (
+            f"{report_format:>5}: {elapsed:7.2f}s  {rows / elapsed:>9,.0f} filas/s  "
+            f"{size / 1024 / 1024:7.1f} MB  (HTTP {response.status_code})"
+        )
+        if memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            line += f"  pico de memoria {peak / 1024 / 1024:.1f} MB"
+        self.stdout.write(line)
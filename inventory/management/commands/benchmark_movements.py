@@ -0,0 +1,75 @@
+# backend/inventory/management/commands/benchmark_movements.py
+
+import contextlib
+import io
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.bulk import ingest_movements
+from inventory.models import InventoryItem, InventoryMovement
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el rendimiento de la carga de movimientos fila a fila (señales) "
+        "con la carga masiva agregada. Todo se ejecuta en una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--items', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        results = {}
+
+        for label, runner in (('por fila', self.run_per_row), ('masivo', self.run_bulk)):
+            try:
+                with transaction.atomic():
+                    item_ids = self.create_items(options['items'])
+                    rows = [
+                        {
+                            'item': rng.choice(item_ids),
+                            'movement_type': rng.choice(['ENTRADA', 'SALIDA']),
+                            'quantity': str(Decimal(rng.randint(1, 500)) / 100),
+                        }
+                        for _ in range(options['rows'])
+                    ]
+                    # Silenciar las alertas impresas por las señales
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        start = time.perf_counter()
+                        runner(rows)
+                        results[label] = time.perf_counter() - start
+                    raise _Rollback()
+            except _Rollback:
+                pass
+
+        for label, elapsed in results.items():
+            self.stdout.write(
+                f"{label:>9}: {options['rows']} filas en {elapsed:.2f}s ({options['rows'] / elapsed:,.0f} filas/s)"
+            )
+        self.stdout.write(f"Aceleración: x{results['por fila'] / results['masivo']:.1f}")
+
+    def create_items(self, count):
+        items = InventoryItem.objects.bulk_create(
+            InventoryItem(name=f"Benchmark {i}", quantity=Decimal('100000')) for i in range(count)
+        )
+        return [item.pk for item in items]
+
+    def run_per_row(self, rows):
+        for row in rows:
+            InventoryMovement.objects.create(
+                item_id=row['item'], movement_type=row['movement_type'], quantity=Decimal(row['quantity'])
+            )
+
+    def run_bulk(self, rows):
+        ingest_movements(rows)
@@ -0,0 +1,79 @@
+# backend/inventory/management/commands/benchmark_renderers.py
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from inventory.renderers import FastJSONRenderer, encode_json, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el rendimiento (MB/s) de JSONRenderer de DRF frente a FastJSONRenderer sobre "
+        "payloads de reporte sintéticos, y verifica que la salida sea idéntica. No usa la base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=3, help="Se informa la mejor de N corridas")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        now = timezone.now()
+        # Como la salida de InventoryMovementSerializer: Decimal y fechas ya como texto
+        serialized = {
+            'report_type': 'movement_history',
+            'data': [
+                {
+                    'id': i, 'item': i % 500, 'item_name': f"Ítem de prueba {i % 500:06d}", 'movement_type': 'ENTRADA',
+                    'quantity': f"{i % 97}.50", 'moved_by': 1, 'moved_by_username': 'bodega',
+                    'movement_date': (now - timedelta(minutes=i)).isoformat(), 'project': f"P-{i % 20}", 'notes': None,
+                }
+                for i in range(rows)
+            ],
+            'message': 'Reporte de historial de movimientos generado exitosamente.',
+        }
+        # Como la valorización: Decimal y fechas nativos, convertidos por el renderer
+        native = {
+            'report_type': 'valuation',
+            'data': [
+                {
+                    'item': i, 'item_name': f"Ítem de prueba {i:06d}", 'quantity': Decimal(i % 200),
+                    'unit_cost': Decimal('1990.50'), 'value': Decimal(i % 200) * Decimal('1990.50'),
+                    'updated_at': now - timedelta(minutes=i), 'expiration_date': (now + timedelta(days=i % 90)).date(),
+                }
+                for i in range(rows)
+            ],
+        }
+
+        self.stdout.write(f"orjson: {'instalado' if orjson is not None else 'no instalado'}")
+        for label, payload in (('Serializado', serialized), ('Nativo', native)):
+            candidates = [
+                ('JSONRenderer', lambda: JSONRenderer().render(payload)),
+                ('stdlib', lambda: encode_json(payload, allow_nan=False, accelerated=False)),
+            ]
+            if orjson is not None:
+                candidates.append(('FastJSONRenderer', lambda: FastJSONRenderer().render(payload)))
+            baseline = None
+            for name, render in candidates:
+                elapsed, content = self.measure(render, options['repeat'])
+                if baseline is None:
+                    baseline, expected = elapsed, content
+                self.stdout.write(
+                    f"{label:>12} {name:>17}: {elapsed * 1000:8.1f} ms  {len(content) / 1024 / 1024 / elapsed:7.1f} MB/s  "
+                    f"{rows / elapsed:>10,.0f} filas/s  x{baseline / elapsed:.1f}  "
+                    f"(idéntico: {'sí' if content == expected else 'NO'})"
+                )
+
+    def measure(self, render, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            content = render()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
@@ -0,0 +1,86 @@
+# backend/inventory/management/commands/benchmark_search.py
+
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from inventory.models import InventoryItem
+from inventory.search import SEARCH_FIELDS, rebuild_search_index, search_item_ids, search_terms
+
+PARTS = ['Perno', 'Tuerca', 'Golilla', 'Rodamiento', 'Correa', 'Filtro', 'Válvula', 'Manguera', 'Engranaje', 'Sello']
+QUALIFIERS = ['hexagonal', 'inoxidable', 'galvanizado', 'hidráulico', 'neumático', 'reforzado', 'industrial', 'de bronce']
+SIZES = ['M6', 'M8', 'M10', 'M12', '1/2"', '3/4"', '6204', '6305', 'A42', 'B55']
+LOCATIONS = [f'Bodega {bodega} - Pasillo {pasillo}' for bodega in 'ABCD' for pasillo in range(1, 13)]
+
+DEFAULT_QUERIES = ['perno m8', 'rodam 6204', 'valvula hidra', 'bodega c', 'BENCH-01234', 'sello bronce pasillo 7']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la búsqueda indexada de ítems con un icontains sobre los mismos campos, "
+        "en un catálogo sintético. Los datos se crean en una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=200000)
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por consulta (se informa la mediana)")
+        parser.add_argument('--query', action='append', dest='queries', help="Consulta a medir (repetible)")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                InventoryItem.objects.bulk_create(
+                    (
+                        InventoryItem(
+                            name=f"{rng.choice(PARTS)} {rng.choice(QUALIFIERS)} {rng.choice(SIZES)}",
+                            serial_number=f"BENCH-{i:06d}",
+                            location=rng.choice(LOCATIONS),
+                            description=f"{rng.choice(PARTS)} de repuesto para línea {i % 40}",
+                            quantity=Decimal(i % 200),
+                        )
+                        for i in range(options['items'])
+                    ),
+                    batch_size=2000,
+                )
+                rebuild_search_index()
+                self.stdout.write(
+                    f"{options['items']:,} ítems creados e indexados en {time.perf_counter() - start:.1f}s ({connection.vendor})"
+                )
+                for query in options['queries'] or DEFAULT_QUERIES:
+                    self.measure(query, options['repeat'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def measure(self, query, repeat):
+        condition = Q()
+        for term in search_terms(query):
+            condition &= Q(*[Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS], _connector=Q.OR)
+        scan = InventoryItem.objects.filter(condition).order_by('name', 'pk').values_list('pk', flat=True)[:20]
+
+        indexed_time, indexed = self.median(lambda: search_item_ids(query, 20), repeat)
+        scan_time, scanned = self.median(lambda: list(scan.all()), repeat)
+        self.stdout.write(
+            f"{query!r:>26}: índice {indexed_time * 1000:8.2f} ms ({len(indexed):>2} res.)   "
+            f"icontains {scan_time * 1000:8.2f} ms ({len(scanned):>2} res.)"
+        )
+
+    def median(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        return timings[len(timings) // 2], result
@@ -0,0 +1,33 @@
+# backend/inventory/management/commands/dispatch_alerts.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory.alerts import dispatch_alerts, enqueue_expiry_alerts
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía por lotes las alertas de stock pendientes al destino configurado "
+        "(INVENTORY_ALERT_SINK). Pensado para INVENTORY_ALERTS_MODE='command'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Enviar las alertas pendientes y terminar")
+        parser.add_argument('--interval', type=float, default=30.0, help="Segundos entre envíos")
+        parser.add_argument('--batch-size', type=int, default=500, help="Máximo de alertas por resumen")
+        parser.add_argument('--scan-expiry', action='store_true', help="Revisar antes los vencimientos de todos los ítems")
+
+    def handle(self, *args, **options):
+        if options['scan_expiry']:
+            enqueue_expiry_alerts()
+
+        while True:
+            sent = dispatch_alerts(batch_size=options['batch_size'])
+            if sent:
+                self.stdout.write(f"{sent} alertas enviadas.")
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
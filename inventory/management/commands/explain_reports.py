@@ -0,0 +1,46 @@
+# backend/inventory/management/commands/explain_reports.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from inventory.models import InventoryItem, InventoryMovement, PurchaseRecord
+from inventory.reports_views import ITEM_REPORT_TITLES, InventoryReportView
+
+
+class Command(BaseCommand):
+    help = (
+        "Imprime el plan de ejecución (EXPLAIN) de las consultas de cada reporte para "
+        "verificar que usan los índices. Funciona con SQLite y PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="EXPLAIN ANALYZE (solo PostgreSQL; ejecuta la consulta)")
+
+    def handle(self, *args, **options):
+        view = InventoryReportView()
+        today = timezone.localdate()
+        item_id = InventoryItem.objects.values_list('pk', flat=True).first() or 1
+
+        queries = [(f'{report_type}', view.item_report_queryset(report_type)) for report_type in ITEM_REPORT_TITLES]
+        queries += [
+            ('movement_history (rango de fechas)', view.movement_history_queryset(today - timedelta(days=30), today)),
+            ('movement_history (ítem + rango)', view.movement_history_queryset(today - timedelta(days=30), today, item_id=item_id)),
+            ('movement_history (tipo + rango)', view.movement_history_queryset(today - timedelta(days=30), today, movement_type='SALIDA')),
+            ('historial de compras por ítem', PurchaseRecord.objects.filter(item_id=item_id).order_by('-purchase_date')),
+            ('paginación de movimientos', InventoryMovement.objects.order_by('-movement_date', '-id')[:10]),
+        ]
+
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                self.stderr.write("--analyze solo está disponible en PostgreSQL; se ignora.")
+            else:
+                explain_options = {'analyze': True, 'buffers': True}
+
+        self.stdout.write(f"Base de datos: {connection.vendor}")
+        for name, queryset in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {name}"))
+            self.stdout.write(queryset.explain(**explain_options))
@@ -0,0 +1,56 @@
+# backend/inventory/management/commands/import_movements.py
+
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.bulk import ingest_movements
+from inventory.stock import InsufficientStockError
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa movimientos de inventario desde un archivo JSON (lista de objetos) "
+        "o CSV (columnas item, movement_type, quantity, project, notes) en una sola transacción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ruta del archivo .json o .csv")
+        parser.add_argument('--user', help="Username que quedará como 'moved_by'")
+        parser.add_argument('--partial', action='store_true', help="Insertar las filas válidas aunque otras tengan errores")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                if path.lower().endswith('.csv'):
+                    rows = list(csv.DictReader(f))
+                else:
+                    rows = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo leer '{path}': {e}")
+
+        if not isinstance(rows, list):
+            raise CommandError("El archivo debe contener una lista de movimientos.")
+
+        moved_by = None
+        if options['user']:
+            try:
+                moved_by = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"El usuario '{options['user']}' no existe.")
+
+        try:
+            result = ingest_movements(rows, moved_by=moved_by, partial=options['partial'])
+        except InsufficientStockError as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"Fila {error['row']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} movimientos importados, {result['items_updated']} ítems actualizados, "
+            f"{len(result['errors'])} filas con errores."
+        ))
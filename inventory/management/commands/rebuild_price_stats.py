@@ -0,0 +1,16 @@
+# backend/inventory/management/commands/rebuild_price_stats.py
+
+from django.core.management.base import BaseCommand
+
+from inventory.prices import rebuild_price_stats
+
+
+class Command(BaseCommand):
+    help = "Reconstruye las estadísticas de precios de compra (PurchasePriceStats) a partir del historial de compras."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--item', type=int, action='append', dest='items', help="Reconstruir solo este ítem (repetible)")
+
+    def handle(self, *args, **options):
+        created = rebuild_price_stats(options['items'])
+        self.stdout.write(self.style.SUCCESS(f"{created} estadísticas de precios generadas."))
@@ -0,0 +1,16 @@
+# backend/inventory/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+
+from inventory.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye el índice de búsqueda de texto de los ítems (FTS5 en SQLite). "
+        "Necesario tras cargas masivas que no disparan señales (bulk_create, QuerySet.update)."
+    )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"{indexed} ítems indexados."))
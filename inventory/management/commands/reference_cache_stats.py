@@ -0,0 +1,20 @@
+# backend/inventory/management/commands/reference_cache_stats.py
+
+from django.core.management.base import BaseCommand
+
+from inventory.models import Category, Supplier, Tag, UserProfile
+from inventory.response_cache import reference_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra los aciertos y fallos acumulados de la caché de respuestas de los "
+        "catálogos de referencia. Con un backend local (locmem) solo ve los de este proceso."
+    )
+
+    def handle(self, *args, **options):
+        labels = [model._meta.label_lower for model in (Category, Tag, Supplier, UserProfile)]
+        for label, counters in reference_cache_stats(labels).items():
+            total = counters['hits'] + counters['misses']
+            ratio = f"{counters['hits'] / total:.0%}" if total else '-'
+            self.stdout.write(f"{label:>22}: {counters['hits']:>8} aciertos  {counters['misses']:>8} fallos  ({ratio})")
@@ -0,0 +1,38 @@
+# backend/inventory/management/commands/run_report_worker.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory.jobs import claim_next_job, fail_stale_jobs, purge_expired_jobs, run_report_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa los trabajos de reportes pendientes (REPORT_JOBS_MODE='command') "
+        "y elimina los archivos vencidos. Los trabajos que quedaron EN_PROCESO por la "
+        "caída de un worker se marcan como FALLIDO tras REPORT_JOBS_STALE_MINUTES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Procesar los trabajos pendientes y terminar")
+        parser.add_argument('--interval', type=float, default=2.0, help="Segundos de espera cuando no hay trabajos")
+
+    def handle(self, *args, **options):
+        while True:
+            stale = fail_stale_jobs()
+            if stale:
+                self.stdout.write(f"{stale} trabajos interrumpidos marcados como fallidos.")
+            purged = purge_expired_jobs()
+            if purged:
+                self.stdout.write(f"{purged} reportes vencidos eliminados.")
+
+            job_id = claim_next_job()
+            if job_id is not None:
+                run_report_job(job_id, claimed=True)
+                self.stdout.write(f"Trabajo {job_id} procesado.")
+                continue
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
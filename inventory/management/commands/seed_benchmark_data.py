@@ -0,0 +1,56 @@
+# backend/inventory/management/commands/seed_benchmark_data.py
+
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.models import InventoryItem
+from inventory.seeding import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga un conjunto de datos sintético y determinista (misma semilla y fecha final, mismos datos) "
+        "para benchmarks: ítems, categorías, proveedores, etiquetas, kits, movimientos y compras, "
+        "insertados en bloque. Requiere una base de datos sin ítems."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--suppliers', type=int, default=100)
+        parser.add_argument('--tags', type=int, default=30)
+        parser.add_argument('--kits', type=int, default=200)
+        parser.add_argument('--movements', type=int, default=1000000)
+        parser.add_argument('--purchases', type=int, default=200000)
+        parser.add_argument('--days', type=int, default=365, help="Días de historial de movimientos y compras")
+        parser.add_argument('--end-date', help="Último día del historial (YYYY-MM-DD, por defecto hoy)")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if InventoryItem.objects.exists():
+            raise CommandError("La base de datos ya tiene ítems. Use una base vacía (p. ej. otra DATABASE_URL) para datos reproducibles.")
+        if options['items'] < 1:
+            raise CommandError("Se necesita al menos un ítem.")
+
+        end_date = None
+        if options['end_date']:
+            try:
+                end_date = datetime.strptime(options['end_date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("Formato de fecha inválido. Use YYYY-MM-DD.")
+
+        start = time.perf_counter()
+        counts = seed_dataset(
+            items=options['items'], categories=options['categories'], suppliers=options['suppliers'],
+            tags=options['tags'], kits=options['kits'], movements=options['movements'],
+            purchases=options['purchases'], days=options['days'], seed=options['seed'],
+            end_date=end_date, batch_size=options['batch_size'],
+            log=lambda message: self.stdout.write(f"  {message}"),
+        )
+        elapsed = time.perf_counter() - start
+        for name, count in counts.items():
+            self.stdout.write(f"{name:>15}: {count:,}")
+        self.stdout.write(self.style.SUCCESS(f"Datos generados en {elapsed:.1f}s."))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_daily_balances(apps, schema_editor):
+    # Saldos de los movimientos ya registrados; sin ellos stock_as_of devolvería
+    # el stock actual para cualquier fecha pasada
+    from inventory.snapshots import rebuild_daily_balances
+
+    rebuild_daily_balances(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_purchaserecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStockBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('closing_quantity', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Cantidad al Cierre')),
+                ('net_change', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Variación del Día')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to='inventory.inventoryitem', verbose_name='Ítem')),
+            ],
+            options={
+                'verbose_name': 'Saldo Diario de Stock',
+                'verbose_name_plural': 'Saldos Diarios de Stock',
+                'ordering': ['item', '-date'],
+                'unique_together': {('item', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_balances, migrations.RunPython.noop),
+    ]
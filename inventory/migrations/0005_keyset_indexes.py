@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['movement_date', 'id'], name='inv_movement_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserecord',
+            index=models.Index(fields=['purchase_date', 'id'], name='inv_purchase_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['expiration_date'], name='inv_item_expiration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('low_stock_threshold'))), fields=['name'], name='inv_item_low_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['item', 'movement_date'], name='inv_movement_item_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['movement_type', 'movement_date'], name='inv_movement_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserecord',
+            index=models.Index(fields=['item', 'purchase_date'], name='inv_purchase_item_date_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_report_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('STOCK_BAJO', 'Stock Bajo'), ('VENCIDO', 'Vencido'), ('POR_VENCER', 'Por Vencer')], max_length=20, verbose_name='Tipo de Alerta')),
+                ('message', models.TextField(verbose_name='Mensaje')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True, verbose_name='Enviada')),
+                ('resolved_at', models.DateTimeField(blank=True, null=True, verbose_name='Resuelta')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='inventory.inventoryitem', verbose_name='Ítem')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Stock',
+                'verbose_name_plural': 'Alertas de Stock',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('dispatched_at__isnull', True), ('resolved_at__isnull', True)), fields=['created_at'], name='inv_alert_pending_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('item', 'kind'), name='unique_open_stock_alert')],
+            },
+        ),
+    ]
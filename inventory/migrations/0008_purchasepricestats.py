@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_price_stats(apps, schema_editor):
+    # Estadísticas del historial ya registrado; sin ellas la primera compra nueva
+    # crearía la fila solo con esa compra y las siguientes la irían sumando
+    from inventory.prices import rebuild_price_stats
+
+    rebuild_price_stats(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_stockalert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchasePriceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purchase_count', models.PositiveIntegerField(default=0, verbose_name='Número de Compras')),
+                ('total_quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Cantidad Total')),
+                ('total_cost', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Costo Total')),
+                ('avg_unit_cost', models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True, verbose_name='Costo Unitario Promedio Ponderado')),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Precio Mínimo')),
+                ('max_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Precio Máximo')),
+                ('last_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Último Precio')),
+                ('last_purchase_date', models.DateField(verbose_name='Fecha de Última Compra')),
+                ('moving_avg_90d', models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True, verbose_name='Promedio Móvil 90 Días')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_stats', to='inventory.inventoryitem', verbose_name='Ítem')),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_stats', to='inventory.supplier', verbose_name='Proveedor')),
+            ],
+            options={
+                'verbose_name': 'Estadística de Precios de Compra',
+                'verbose_name_plural': 'Estadísticas de Precios de Compra',
+                'ordering': ['item', 'supplier'],
+                'constraints': [models.UniqueConstraint(fields=('item', 'supplier'), name='unique_price_stats_item_supplier'), models.UniqueConstraint(condition=models.Q(('supplier__isnull', True)), fields=('item',), name='unique_price_stats_item')],
+            },
+        ),
+        migrations.RunPython(backfill_price_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# Índice de texto de InventoryItem según el motor (ver inventory/search.py).
+# Las expresiones se copian aquí para que la migración no dependa del código actual.
+
+FTS_COLUMNS = 'name, serial_number, location, description'
+
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(serial_number, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE inventory_item_fts USING fts5({FTS_COLUMNS}, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO inventory_item_fts (rowid, {FTS_COLUMNS}) "
+            "SELECT id, coalesce(name, ''), coalesce(serial_number, ''), coalesce(location, ''), coalesce(description, '') "
+            "FROM inventory_inventoryitem"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(f"CREATE INDEX inv_item_search_idx ON inventory_inventoryitem USING gin (({PG_DOCUMENT}))")
+        schema_editor.execute("CREATE INDEX inv_item_name_trgm_idx ON inventory_inventoryitem USING gin (name gin_trgm_ops)")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS inventory_item_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS inv_item_search_idx")
+        schema_editor.execute("DROP INDEX IF EXISTS inv_item_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_purchasepricestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
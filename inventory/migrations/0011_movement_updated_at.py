@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-17 05:47
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Los movimientos existentes no se han editado desde su registro
+    InventoryMovement = apps.get_model('inventory', 'InventoryMovement')
+    InventoryMovement.objects.update(updated_at=F('movement_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Actualización'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['updated_at'], name='inv_movement_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-17 06:04
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    # Fila única que incrementa report_cache.bump_data_version
+    DataVersion = apps.get_model('inventory', 'DataVersion')
+    DataVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_movement_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Versión')),
+                ('changed_at', models.DateTimeField(blank=True, null=True, verbose_name='Último Cambio')),
+            ],
+            options={
+                'verbose_name': 'Versión de los Datos',
+                'verbose_name_plural': 'Versión de los Datos',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['updated_at'], name='inv_item_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchasepricestats',
+            index=models.Index(fields=['updated_at'], name='inv_price_stats_updated_idx'),
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
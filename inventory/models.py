@@ -1,11 +1,20 @@
 # backend/inventory/models.py
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser, Group, Permission
-from django.db.models.signals import post_save, pre_save, pre_delete
+from django.db.models.signals import post_save, pre_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.conf import settings
 from datetime import date, timedelta
+from django.utils import timezone
+from .stock import apply_movement_deltas, movement_delta
+from .report_cache import bump_data_version
+from .kits import bump_kit_version
+from .prices import recompute_price_stats, record_purchase, stats_keys
+from .alerts import enqueue_stock_alerts
+from .authentication import invalidate_cached_token, invalidate_user_tokens
+from .search import index_item, unindex_item
+from .response_cache import bump_reference_version
 
 # Definimos los roles de usuario como una tupla de tuplas
 USER_ROLES = (
@@ -22,6 +31,12 @@ USER_ROLES = (
 class UserProfile(AbstractUser):
     role = models.CharField(max_length=20, choices=USER_ROLES, default='USUARIO_FINAL')
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Filtro ?role= de /api/users/, ordenado por usuario
+            models.Index(fields=['role', 'username'], name='inv_user_role_idx'),
+        ]
+
     groups = models.ManyToManyField(
         Group,
         verbose_name=('groups'),
@@ -88,6 +103,53 @@ class Tag(models.Model):
         return self.name
 
 
+# Días antes del vencimiento en que un ítem se considera "por vencer"
+EXPIRING_SOON_DAYS = 180
+
+
+# Anotaciones de InventoryItemQuerySet.with_status()
+STATUS_ANNOTATIONS = ('low_stock', 'expired', 'expiring_soon')
+
+
+def _flag(condition):
+    return models.Case(models.When(condition, then=models.Value(True)), default=models.Value(False), output_field=models.BooleanField())
+
+
+class InventoryItemQuerySet(models.QuerySet):
+    """
+    Estado de stock y vencimiento calculado en la base de datos, para poder
+    filtrar y ordenar por él sin cargar los ítems en Python.
+    """
+    def with_status(self, today=None):
+        """
+        Anota low_stock, expired y expiring_soon (booleanos). Las propiedades
+        is_low_stock / is_expired / is_expiring_soon usan estos valores si existen.
+        """
+        today = today or date.today()
+        return self.annotate(
+            # Nombres en STATUS_ANNOTATIONS
+            low_stock=_flag(models.Q(quantity__lte=models.F('low_stock_threshold'))),
+            expired=_flag(models.Q(expiration_date__lte=today)),
+            expiring_soon=_flag(models.Q(expiration_date__lte=today + timedelta(days=EXPIRING_SOON_DAYS))),
+        )
+
+    def low_stock(self, value=True):
+        # Misma condición que el índice parcial inv_item_low_stock_idx
+        condition = models.Q(quantity__lte=models.F('low_stock_threshold'))
+        return self.filter(condition) if value else self.exclude(condition)
+
+    def expired(self, value=True, today=None):
+        condition = models.Q(expiration_date__lte=today or date.today())
+        return self.filter(condition) if value else self.exclude(condition)
+
+    def expiring_within(self, days, today=None):
+        """
+        Ítems aún vigentes que vencen dentro de `days` días (rango sobre expiration_date).
+        """
+        today = today or date.today()
+        return self.filter(expiration_date__gte=today, expiration_date__lte=today + timedelta(days=days))
+
+
 class InventoryItem(models.Model):
     name = models.CharField(max_length=255, verbose_name="Nombre del Ítem")
     description = models.TextField(blank=True, null=True, verbose_name="Descripción")
@@ -105,21 +167,55 @@ class InventoryItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
 
+    objects = InventoryItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Ítem de Inventario"
         verbose_name_plural = "Ítems de Inventario"
         ordering = ['name']
+        indexes = [
+            # Orden por defecto y ?ordering= de /api/inventory/ (el id desempata)
+            models.Index(fields=['name', 'id'], name='inv_item_name_idx'),
+            models.Index(fields=['quantity', 'id'], name='inv_item_quantity_idx'),
+            # Filtro ?location=, ordenado por nombre
+            models.Index(fields=['location', 'name'], name='inv_item_location_idx'),
+            # Reporte expiring_soon (rango sobre expiration_date)
+            models.Index(fields=['expiration_date'], name='inv_item_expiration_idx'),
+            # Marca de agua de report_cache y de la disponibilidad de kits (último updated_at)
+            models.Index(fields=['updated_at'], name='inv_item_updated_idx'),
+            # Reporte low_stock: índice parcial que contiene solo los ítems bajo el umbral,
+            # ordenado por nombre como el reporte
+            models.Index(
+                fields=['name'], condition=models.Q(quantity__lte=models.F('low_stock_threshold')),
+                name='inv_item_low_stock_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Las anotaciones de with_status() quedan obsoletas al guardar (p. ej. la
+        # respuesta de un PUT/PATCH): las propiedades vuelven a calcularse en Python
+        for name in STATUS_ANNOTATIONS:
+            self.__dict__.pop(name, None)
+
+    @property
+    def is_low_stock(self):
+        if hasattr(self, 'low_stock'):
+            return self.low_stock # Valor anotado por with_status()
+        return self.low_stock_threshold is not None and self.quantity <= self.low_stock_threshold
+
     @property
     def is_expiring_soon(self):
         """
         Determina si el ítem está por vencer pronto (ej. en los próximos 6 meses).
         """
+        if hasattr(self, 'expiring_soon'):
+            return self.expiring_soon
         if self.expiration_date:
-            return self.expiration_date <= date.today() + timedelta(days=180) # Menos de 6 meses
+            return self.expiration_date <= date.today() + timedelta(days=EXPIRING_SOON_DAYS) # Menos de 6 meses
         return False
 
     @property
@@ -127,6 +223,8 @@ class InventoryItem(models.Model):
         """
         Determina si el ítem ya ha vencido.
         """
+        if hasattr(self, 'expired'):
+            return self.expired
         if self.expiration_date:
             return self.expiration_date <= date.today()
         return False
@@ -147,15 +245,37 @@ class InventoryMovement(models.Model):
     movement_date = models.DateTimeField(auto_now_add=True, verbose_name="Fecha y Hora del Movimiento")
     project = models.CharField(max_length=255, blank=True, null=True, verbose_name="Proyecto Asociado")
     notes = models.TextField(blank=True, null=True, verbose_name="Notas")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
 
     class Meta:
         verbose_name = "Movimiento de Inventario"
         verbose_name_plural = "Movimientos de Inventario"
         ordering = ['-movement_date']
+        indexes = [
+            # Respaldan la paginación por cursor de /api/movements/
+            models.Index(fields=['movement_date', 'id'], name='inv_movement_date_id_idx'),
+            # Historial de movimientos filtrado por ítem o por tipo dentro de un rango de fechas
+            models.Index(fields=['item', 'movement_date'], name='inv_movement_item_date_idx'),
+            models.Index(fields=['movement_type', 'movement_date'], name='inv_movement_type_date_idx'),
+            # Filtro ?project= de /api/movements/
+            models.Index(fields=['project', 'movement_date'], name='inv_movement_project_date_idx'),
+            # Marca de agua del GET condicional (Max('updated_at') del listado)
+            models.Index(fields=['updated_at'], name='inv_movement_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.movement_type} de {self.quantity} de {self.item.name} por {self.moved_by or 'N/A'}"
 
+    def save(self, *args, **kwargs):
+        # El guardado y la actualización de stock (señal post_save) van en la misma
+        # transacción: si el stock no alcanza, tampoco queda registrado el movimiento.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
 
 class Kit(models.Model):
     name = models.CharField(max_length=255, unique=True, verbose_name="Nombre del Kit")
@@ -197,11 +317,169 @@ class PurchaseRecord(models.Model):
         verbose_name = "Registro de Compra"
         verbose_name_plural = "Registros de Compra"
         ordering = ['-purchase_date', 'item__name'] # Ordenar por fecha descendente y luego por nombre del ítem
+        indexes = [
+            models.Index(fields=['purchase_date', 'id'], name='inv_purchase_date_id_idx'),
+            models.Index(fields=['item', 'purchase_date'], name='inv_purchase_item_date_idx'),
+        ]
 
     def __str__(self):
         return f"Compra de {self.quantity_purchased} de {self.item.name} a ${self.unit_price} el {self.purchase_date}"
 
 
+# --- Estadísticas de precios de compra (mantenidas de forma incremental, ver prices.py) ---
+class PurchasePriceStats(models.Model):
+    """
+    Resumen de precios de compra por ítem (supplier vacío = todos los proveedores)
+    y por ítem + proveedor. Se actualiza al crear, editar o eliminar un
+    PurchaseRecord; se puede reconstruir con el comando rebuild_price_stats.
+    """
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='price_stats', verbose_name="Ítem")
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, null=True, blank=True, related_name='price_stats', verbose_name="Proveedor")
+    purchase_count = models.PositiveIntegerField(default=0, verbose_name="Número de Compras")
+    total_quantity = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Cantidad Total")
+    total_cost = models.DecimalField(max_digits=18, decimal_places=4, default=0, verbose_name="Costo Total")
+    avg_unit_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, verbose_name="Costo Unitario Promedio Ponderado")
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Precio Mínimo")
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Precio Máximo")
+    last_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Último Precio")
+    last_purchase_date = models.DateField(verbose_name="Fecha de Última Compra")
+    moving_avg_90d = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, verbose_name="Promedio Móvil 90 Días")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    class Meta:
+        verbose_name = "Estadística de Precios de Compra"
+        verbose_name_plural = "Estadísticas de Precios de Compra"
+        ordering = ['item', 'supplier']
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'supplier'], name='unique_price_stats_item_supplier'),
+            # NULL no se considera repetido en un índice único: fila "todos los proveedores"
+            models.UniqueConstraint(fields=['item'], condition=models.Q(supplier__isnull=True), name='unique_price_stats_item'),
+        ]
+        indexes = [
+            # Marca de agua de report_cache (valorización)
+            models.Index(fields=['updated_at'], name='inv_price_stats_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} / {self.supplier_id or 'todos'}: {self.purchase_count} compras"
+
+
+# --- Saldos diarios de stock (para consultas "stock a una fecha") ---
+class DailyStockBalance(models.Model):
+    """
+    Saldo de un ítem al cierre de cada día con movimientos. Se mantiene de forma
+    incremental al registrar movimientos (ver snapshots.py) y se puede reconstruir
+    con el comando backfill_daily_balances.
+    """
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='daily_balances', verbose_name="Ítem")
+    date = models.DateField(verbose_name="Fecha")
+    closing_quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Cantidad al Cierre")
+    net_change = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Variación del Día")
+
+    class Meta:
+        unique_together = ('item', 'date')
+        verbose_name = "Saldo Diario de Stock"
+        verbose_name_plural = "Saldos Diarios de Stock"
+        ordering = ['item', '-date']
+
+    def __str__(self):
+        return f"{self.item_id} al {self.date}: {self.closing_quantity}"
+
+
+# --- Trabajos de generación de reportes en segundo plano ---
+class ReportJob(models.Model):
+    STATUS_CHOICES = (
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+        ('EXPIRADO', 'Expirado'),
+    )
+
+    report_type = models.CharField(max_length=50, verbose_name="Tipo de Reporte")
+    report_format = models.CharField(max_length=10, default='pdf', verbose_name="Formato")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parámetros")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDIENTE', db_index=True, verbose_name="Estado")
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='report_jobs', verbose_name="Solicitado por")
+    artifact = models.CharField(max_length=255, blank=True, default='', verbose_name="Archivo Generado")
+    content_type = models.CharField(max_length=100, blank=True, default='', verbose_name="Tipo de Contenido")
+    size = models.PositiveBigIntegerField(default=0, verbose_name="Tamaño (bytes)")
+    error = models.TextField(blank=True, default='', verbose_name="Error")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Inicio")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Término")
+    expires_at = models.DateTimeField(blank=True, null=True, verbose_name="Expira")
+
+    class Meta:
+        verbose_name = "Trabajo de Reporte"
+        verbose_name_plural = "Trabajos de Reporte"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.report_type} ({self.report_format}) - {self.get_status_display()}"
+
+
+# --- Alertas de stock bajo y vencimiento ---
+class StockAlert(models.Model):
+    """
+    Alerta pendiente de envío. Solo puede haber una alerta abierta (sin resolved_at)
+    por ítem y tipo: mientras el ítem siga bajo el umbral no se vuelve a avisar.
+    La escribe enqueue_stock_alerts y la envía dispatch_alerts (ver alerts.py).
+    """
+    KINDS = (
+        ('STOCK_BAJO', 'Stock Bajo'),
+        ('VENCIDO', 'Vencido'),
+        ('POR_VENCER', 'Por Vencer'),
+    )
+
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='alerts', verbose_name="Ítem")
+    kind = models.CharField(max_length=20, choices=KINDS, verbose_name="Tipo de Alerta")
+    message = models.TextField(verbose_name="Mensaje")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    dispatched_at = models.DateTimeField(blank=True, null=True, verbose_name="Enviada")
+    resolved_at = models.DateTimeField(blank=True, null=True, verbose_name="Resuelta")
+
+    class Meta:
+        verbose_name = "Alerta de Stock"
+        verbose_name_plural = "Alertas de Stock"
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['item', 'kind'], condition=models.Q(resolved_at__isnull=True),
+                name='unique_open_stock_alert',
+            ),
+        ]
+        indexes = [
+            # Cola del dispatcher: alertas abiertas aún no enviadas
+            models.Index(
+                fields=['created_at'], condition=models.Q(dispatched_at__isnull=True, resolved_at__isnull=True),
+                name='inv_alert_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.item_id}"
+
+
+# --- Versión de los datos (caché de reportes y GET condicionales, ver report_cache.py) ---
+class DataVersion(models.Model):
+    """
+    Fila única con la versión de los cambios que no mueven ninguna marca de agua
+    updated_at / id: renombrar o eliminar una categoría, proveedor, etiqueta,
+    usuario o ítem, eliminar filas y editar un movimiento. La incrementa
+    report_cache.bump_data_version en la misma transacción que el cambio.
+    """
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Versión")
+    changed_at = models.DateTimeField(null=True, blank=True, verbose_name="Último Cambio")
+
+    class Meta:
+        verbose_name = "Versión de los Datos"
+        verbose_name_plural = "Versión de los Datos"
+
+    def __str__(self):
+        return f"v{self.version}"
+
+
 # --- Señales de Django ---
 
 @receiver(pre_save, sender=InventoryMovement)
@@ -210,19 +488,18 @@ def store_old_movement_data(sender, instance, **kwargs):
     Almacena los valores antiguos de un movimiento antes de que se guarde,
     necesario para recalcular correctamente el stock en caso de actualización.
     """
+    instance._old_item_id = None
+    instance._old_quantity = None
+    instance._old_movement_type = None
+
     if instance.pk: # Si la instancia ya existe (es una actualización)
-        try:
-            # Obtener la instancia antigua de la base de datos
-            old_instance = sender.objects.get(pk=instance.pk)
-            # Almacenar los valores antiguos temporalmente
-            instance._old_quantity = old_instance.quantity
-            instance._old_movement_type = old_instance.movement_type
-        except sender.DoesNotExist:
-            instance._old_quantity = None
-            instance._old_movement_type = None
-    else: # Es una nueva creación
-        instance._old_quantity = None
-        instance._old_movement_type = None
+        old_values = sender.objects.filter(pk=instance.pk).values(
+            'item_id', 'quantity', 'movement_type'
+        ).first()
+        if old_values is not None:
+            instance._old_item_id = old_values['item_id']
+            instance._old_quantity = old_values['quantity']
+            instance._old_movement_type = old_values['movement_type']
 
 
 @receiver(post_save, sender=InventoryMovement)
@@ -230,93 +507,132 @@ def update_inventory_quantity(sender, instance, created, **kwargs):
     """
     Actualiza la cantidad del InventoryItem asociado después de un movimiento.
     Maneja tanto creaciones como actualizaciones de movimientos.
+
+    La variación se aplica con aritmética en la base de datos (ver stock.py),
+    así que no se pierden actualizaciones cuando hay movimientos concurrentes.
     """
-    try:
-        # Obtener el InventoryItem más reciente desde la base de datos
-        item = InventoryItem.objects.get(pk=instance.item.pk)
-        current_item_quantity = item.quantity # Cantidad actual del ítem en DB
-    except InventoryItem.DoesNotExist:
-        print(f"ERROR: InventoryItem con ID {instance.item.pk} no encontrado para el movimiento {instance.pk}. No se puede actualizar el stock.")
-        return # Salir si el ítem no existe
-
-    new_quantity_value = current_item_quantity
-
-    if created: # Es un nuevo movimiento
-        if instance.movement_type == 'ENTRADA' or instance.movement_type == 'DEVOLUCION':
-            new_quantity_value += instance.quantity
-        elif instance.movement_type == 'SALIDA' or instance.movement_type == 'TRANSFERENCIA':
-            new_quantity_value -= instance.quantity
-
-    else: # El movimiento fue actualizado
-        old_quantity = getattr(instance, '_old_quantity', None)
-        old_movement_type = getattr(instance, '_old_movement_type', None)
-
-        if old_quantity is not None and old_movement_type is not None:
-            # Revertir el efecto del movimiento antiguo
-            if old_movement_type == 'ENTRADA' or old_movement_type == 'DEVOLUCION':
-                new_quantity_value -= old_quantity
-            elif old_movement_type == 'SALIDA' or old_movement_type == 'TRANSFERENCIA':
-                new_quantity_value += old_quantity
-            
-            # Aplicar el efecto del nuevo movimiento
-            if instance.movement_type == 'ENTRADA' or instance.movement_type == 'DEVOLUCION':
-                new_quantity_value += instance.quantity
-            elif instance.movement_type == 'SALIDA' or instance.movement_type == 'TRANSFERENCIA':
-                new_quantity_value -= instance.quantity
-        else:
-            # Fallback: Si no hay datos antiguos, solo aplicar el nuevo cambio de forma simple
-            if instance.movement_type == 'ENTRADA' or instance.movement_type == 'DEVOLUCION':
-                new_quantity_value += instance.quantity
-            elif instance.movement_type == 'SALIDA' or instance.movement_type == 'TRANSFERENCIA':
-                new_quantity_value -= instance.quantity
-
-    # Actualizar la cantidad en la base de datos de forma directa
-    try:
-        InventoryItem.objects.filter(pk=item.pk).update(quantity=new_quantity_value)
-        # Recargar el ítem desde la DB para la comprobación del umbral y vencimiento
-        item_updated_from_db = InventoryItem.objects.get(pk=item.pk)
-    except Exception as e:
-        print(f"ERROR: Fallo al actualizar la cantidad del ítem '{item.name}' en la base de datos: {e}")
-        return # Salir si no se pudo actualizar la DB
-
-    # Verificar el umbral de stock bajo y fechas de vencimiento
-    if item_updated_from_db.quantity <= item_updated_from_db.low_stock_threshold:
-        print(f"!!! ALERTA DE STOCK BAJO: El ítem '{item_updated_from_db.name}' tiene {item_updated_from_db.quantity} unidades. El umbral es {item_updated_from_db.low_stock_threshold}.")
-    
-    if item_updated_from_db.is_expired:
-        print(f"!!! ALERTA DE VENCIMIENTO: El ítem '{item_updated_from_db.name}' ha VENCIDO el {item_updated_from_db.expiration_date}.")
-    elif item_updated_from_db.is_expiring_soon:
-        print(f"!!! ALERTA DE VENCIMIENTO PROXIMO: El ítem '{item_updated_from_db.name}' vencerá pronto ({item_updated_from_db.expiration_date}).")
+    day = timezone.localdate(instance.movement_date)
+    deltas = {(instance.item_id, day): movement_delta(instance.movement_type, instance.quantity)}
+
+    old_item_id = getattr(instance, '_old_item_id', None)
+    if not created and old_item_id is not None:
+        # Revertir el efecto del movimiento antiguo (puede ser otro ítem)
+        old_delta = movement_delta(instance._old_movement_type, instance._old_quantity)
+        deltas[(old_item_id, day)] = deltas.get((old_item_id, day), 0) - old_delta
+
+    # Solo se encolan las alertas; el envío lo hace el dispatcher (ver alerts.py)
+    enqueue_stock_alerts(apply_movement_deltas(deltas))
 
 
 @receiver(pre_delete, sender=InventoryMovement)
-def revert_inventory_quantity_on_delete(sender, instance, **kwargs):
+def revert_inventory_quantity_on_delete(sender, instance, origin=None, **kwargs):
     """
     Revertir el stock del InventoryItem cuando un InventoryMovement es eliminado.
     """
-    try:
-        item = InventoryItem.objects.get(pk=instance.item.pk)
-        
-        reverted_quantity = item.quantity
-        if instance.movement_type == 'ENTRADA' or instance.movement_type == 'DEVOLUCION':
-            reverted_quantity -= instance.quantity
-        elif instance.movement_type == 'SALIDA' or instance.movement_type == 'TRANSFERENCIA':
-            reverted_quantity += instance.quantity
-        
-        InventoryItem.objects.filter(pk=item.pk).update(quantity=reverted_quantity)
-        
-        # Opcional: Re-verificar umbral después de la eliminación
-        item_after_revert = InventoryItem.objects.get(pk=item.pk)
-        if item_after_revert.quantity <= item_after_revert.low_stock_threshold:
-            print(f"!!! ALERTA DE STOCK BAJO DESPUÉS DE REVERTIR: El ítem '{item_after_revert.name}' tiene {item_after_revert.quantity} unidades. El umbral es {item_after_revert.low_stock_threshold}.")
-        
-        if item_after_revert.is_expired:
-            print(f"!!! ALERTA DE VENCIMIENTO DESPUÉS DE REVERTIR: El ítem '{item_after_revert.name}' ha VENCIDO el {item_after_revert.expiration_date}.")
-        elif item_after_revert.is_expiring_soon:
-            print(f"!!! ALERTA DE VENCIMIENTO PROXIMO DESPUÉS DE REVERTIR: El ítem '{item_after_revert.name}' vencerá pronto ({item_after_revert.expiration_date}).")
-
-    except InventoryItem.DoesNotExist:
-        print(f"ERROR: InventoryItem con ID {instance.item.pk} no encontrado durante pre_delete para movimiento {instance.pk}.")
-    except Exception as e:
-        print(f"ERROR: Fallo al revertir stock para '{instance.item.name}' en pre_delete: {e}")
+    if isinstance(origin, InventoryItem):
+        # El ítem completo se está eliminando en cascada: no hay stock que revertir
+        return
 
+    day = timezone.localdate(instance.movement_date)
+    enqueue_stock_alerts(apply_movement_deltas({(instance.item_id, day): -movement_delta(instance.movement_type, instance.quantity)}))
+
+
+@receiver(pre_save, sender=PurchaseRecord)
+def store_old_purchase_keys(sender, instance, **kwargs):
+    """
+    Guarda el ítem y proveedor anteriores de una compra editada, para recalcular
+    también las estadísticas de las claves que deja.
+    """
+    instance._old_price_keys = []
+    if instance.pk:
+        old = sender.objects.filter(pk=instance.pk).values('item_id', 'supplier_id').first()
+        if old is not None:
+            instance._old_price_keys = stats_keys(old['item_id'], old['supplier_id'])
+
+
+@receiver(post_save, sender=PurchaseRecord)
+def update_price_stats(sender, instance, created, **kwargs):
+    if created:
+        record_purchase(instance)
+        return
+    keys = getattr(instance, '_old_price_keys', []) + stats_keys(instance.item_id, instance.supplier_id)
+    recompute_price_stats(dict.fromkeys(keys))
+
+
+@receiver(post_delete, sender=PurchaseRecord)
+def remove_from_price_stats(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (InventoryItem, Supplier)):
+        # Las estadísticas del ítem/proveedor se eliminan en cascada con él
+        return
+    recompute_price_stats(stats_keys(instance.item_id, instance.supplier_id))
+
+
+# Versión de los datos (report_cache): altas y ediciones ya mueven updated_at / id
+# de ítems, movimientos y estadísticas de precios; aquí se señalan los cambios que
+# no lo hacen. Son acciones poco frecuentes y se cuenta una sola fila, en lugar de
+# actualizar todas las filas que muestran el nombre cambiado.
+DISPLAY_NAMES = {
+    InventoryItem: 'name',       # item_name de los movimientos
+    Category: 'name',            # category_name de los ítems
+    Supplier: 'name',            # supplier_name de los ítems
+    Tag: 'name',
+    UserProfile: 'username',     # moved_by_username de los movimientos
+}
+
+
+def store_old_display_name(sender, instance, update_fields=None, **kwargs):
+    field = DISPLAY_NAMES[sender]
+    instance._old_display_name = None
+    if instance.pk and (update_fields is None or field in update_fields):
+        instance._old_display_name = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+def bump_on_rename(sender, instance, created, **kwargs):
+    old = getattr(instance, '_old_display_name', None)
+    if not created and old is not None and old != getattr(instance, DISPLAY_NAMES[sender]):
+        bump_data_version()
+
+
+def bump_on_movement_edit(sender, instance, created, **kwargs):
+    # Notas, proyecto o usuario de un movimiento ya registrado (movement_history)
+    if not created:
+        bump_data_version()
+
+
+def bump_on_tags_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_data_version()
+
+
+def bump_on_delete(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, models.Model) and not isinstance(origin, sender):
+        # Borrado en cascada: ya lo señala la eliminación que lo originó
+        return
+    bump_data_version()
+
+
+for _model in DISPLAY_NAMES:
+    pre_save.connect(store_old_display_name, sender=_model, dispatch_uid=f'data_version_old_name_{_model.__name__}')
+    post_save.connect(bump_on_rename, sender=_model, dispatch_uid=f'data_version_rename_{_model.__name__}')
+for _model in (InventoryItem, InventoryMovement, PurchasePriceStats, Category, Supplier, Tag, UserProfile):
+    post_delete.connect(bump_on_delete, sender=_model, dispatch_uid=f'data_version_delete_{_model.__name__}')
+post_save.connect(bump_on_movement_edit, sender=InventoryMovement, dispatch_uid='data_version_movement_edit')
+m2m_changed.connect(bump_on_tags_change, sender=InventoryItem.tags.through, dispatch_uid='data_version_item_tags')
+
+# Invalidar la disponibilidad de kits cuando cambia su composición (ver kits.py)
+for _model in (Kit, KitItem):
+    post_save.connect(bump_kit_version, sender=_model, dispatch_uid=f'kit_availability_save_{_model.__name__}')
+    post_delete.connect(bump_kit_version, sender=_model, dispatch_uid=f'kit_availability_delete_{_model.__name__}')
+
+# Invalidar la caché de autenticación por token (ver authentication.py)
+post_delete.connect(invalidate_cached_token, sender='authtoken.Token', dispatch_uid='auth_cache_token_delete')
+post_save.connect(invalidate_user_tokens, sender=UserProfile, dispatch_uid='auth_cache_user_save')
+
+# Mantener el índice de búsqueda de texto de los ítems (ver search.py)
+post_save.connect(index_item, sender=InventoryItem, dispatch_uid='search_index_item_save')
+post_delete.connect(unindex_item, sender=InventoryItem, dispatch_uid='search_index_item_delete')
+
+# Invalidar la caché de respuestas de los catálogos de referencia (ver response_cache.py)
+for _model in (UserProfile, Supplier, Category, Tag):
+    post_save.connect(bump_reference_version, sender=_model, dispatch_uid=f'reference_cache_save_{_model.__name__}')
+    post_delete.connect(bump_reference_version, sender=_model, dispatch_uid=f'reference_cache_delete_{_model.__name__}')
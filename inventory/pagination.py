@@ -0,0 +1,125 @@
+# backend/inventory/pagination.py
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+from .filters import IndexedOrderingFilter
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor sobre una clave compuesta (campo de orden, id). La
+    posición del cursor guarda ambos valores, por lo que cada página filtra con
+    un WHERE sobre el índice en lugar de COUNT(*) + OFFSET, y el costo de una
+    página profunda es el mismo que el de la primera.
+    El cliente puede elegir el tamaño con ?page_size=N (máximo max_page_size).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    position_separator = '|'
+
+    def get_ordering(self, request, queryset, view):
+        # Por defecto la clave compuesta fija; con ?ordering= permitido por la vista,
+        # (campo elegido, id), que IndexedOrderingFilter limita a campos indexados
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, IndexedOrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return tuple(ordering)
+        return tuple(self.ordering)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(str(value))
+        return self.position_separator.join(values)
+
+    def keyset_filter(self, position, reverse):
+        """
+        Condición (a, b) < (pa, pb) expandida como a < pa OR (a = pa AND b < pb),
+        respetando la dirección de cada campo y la del cursor.
+        """
+        values = position.split(self.position_separator)
+        if len(values) != len(self.ordering):
+            raise ValueError(position)
+
+        condition = Q()
+        equal = Q()
+        for order, value in zip(self.ordering, values):
+            field_name = order.lstrip('-')
+            lookup = 'lt' if reverse != order.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field_name}__{lookup}': value})
+            equal &= Q(**{field_name: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*[
+                order[1:] if order.startswith('-') else '-' + order for order in self.ordering
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self.keyset_filter(current_position, reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # Se pide una fila extra para saber si existe una página siguiente
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class InventoryMovementPagination(KeysetPagination):
+    ordering = ('-movement_date', '-id')
+
+
+class PurchaseRecordPagination(KeysetPagination):
+    ordering = ('-purchase_date', '-id')
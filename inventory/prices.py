@@ -0,0 +1,214 @@
+# backend/inventory/prices.py
+
+from collections import deque
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+# Ventana del promedio móvil, anclada en la última compra de cada clave
+MOVING_AVERAGE_DAYS = 90
+
+_cost_field = DecimalField(max_digits=18, decimal_places=4)
+_QUANT = Decimal('0.0001')
+
+
+def stats_keys(item_id, supplier_id):
+    """
+    Claves de PurchasePriceStats que afecta una compra: el ítem (supplier=None,
+    todos los proveedores) y, si tiene proveedor, el par ítem + proveedor.
+    """
+    keys = [(item_id, None)]
+    if supplier_id is not None:
+        keys.append((item_id, supplier_id))
+    return keys
+
+
+def _purchases(item_id, supplier_id):
+    from .models import PurchaseRecord
+
+    purchases = PurchaseRecord.objects.filter(item_id=item_id)
+    if supplier_id is not None:
+        purchases = purchases.filter(supplier_id=supplier_id)
+    return purchases
+
+
+def _stats(item_id, supplier_id):
+    from .models import PurchasePriceStats
+
+    return PurchasePriceStats.objects.filter(item_id=item_id, supplier_id=supplier_id)
+
+
+def _average(cost, quantity):
+    if not quantity:
+        return None
+    return (Decimal(cost) / Decimal(quantity)).quantize(_QUANT)
+
+
+def _refresh_averages(item_id, supplier_id):
+    """
+    Recalcula el promedio ponderado a partir de los totales ya acumulados y el
+    promedio de los últimos MOVING_AVERAGE_DAYS días hasta la última compra (una
+    consulta por rango sobre el índice (item, purchase_date)). El promedio se
+    divide en Python: en SQLite la división de dos totales enteros es entera.
+    """
+    current = _stats(item_id, supplier_id).values_list('last_purchase_date', 'total_cost', 'total_quantity').first()
+    if current is None:
+        return
+    last_date, total_cost, total_quantity = current
+    window = _purchases(item_id, supplier_id).filter(
+        purchase_date__gt=last_date - timedelta(days=MOVING_AVERAGE_DAYS), purchase_date__lte=last_date,
+    ).aggregate(
+        quantity=Sum('quantity_purchased'),
+        cost=Sum(F('unit_price') * F('quantity_purchased'), output_field=_cost_field),
+    )
+    _stats(item_id, supplier_id).update(
+        avg_unit_cost=_average(total_cost, total_quantity),
+        moving_avg_90d=_average(window['cost'] or 0, window['quantity']),
+        # QuerySet.update() no aplica auto_now; es la marca de agua de report_cache
+        updated_at=timezone.now(),
+    )
+
+
+def _add_to_key(item_id, supplier_id, purchase_date, price, quantity):
+    from .models import PurchasePriceStats
+
+    cost = price * quantity
+    updated = _stats(item_id, supplier_id).update(
+        purchase_count=F('purchase_count') + 1,
+        total_quantity=F('total_quantity') + quantity,
+        total_cost=F('total_cost') + cost,
+        min_price=Least(F('min_price'), Value(price)),
+        max_price=Greatest(F('max_price'), Value(price)),
+        last_price=Case(When(last_purchase_date__lte=purchase_date, then=Value(price)), default=F('last_price')),
+        last_purchase_date=Greatest(F('last_purchase_date'), Value(purchase_date)),
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            PurchasePriceStats.objects.create(
+                item_id=item_id, supplier_id=supplier_id, purchase_count=1,
+                total_quantity=quantity, total_cost=cost, avg_unit_cost=_average(cost, quantity),
+                min_price=price, max_price=price, last_price=price, last_purchase_date=purchase_date,
+            )
+    except IntegrityError:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT
+        _add_to_key(item_id, supplier_id, purchase_date, price, quantity)
+
+
+def record_purchase(purchase):
+    """
+    Suma una compra nueva a las estadísticas de sus claves sin releer el historial:
+    contadores, totales, mínimo, máximo y último precio se actualizan con
+    expresiones en la base de datos (seguro ante compras concurrentes) y luego
+    se recalculan los promedios desde esos totales.
+    """
+    price = Decimal(purchase.unit_price)
+    quantity = Decimal(purchase.quantity_purchased)
+    with transaction.atomic():
+        for item_id, supplier_id in stats_keys(purchase.item_id, purchase.supplier_id):
+            _add_to_key(item_id, supplier_id, purchase.purchase_date, price, quantity)
+            _refresh_averages(item_id, supplier_id)
+
+
+def recompute_price_stats(keys):
+    """
+    Recalcula desde el historial las claves indicadas. Se usa al editar o eliminar
+    una compra: el mínimo, el máximo y el último precio no se pueden "restar".
+    Cada clave es una consulta acotada por el índice (item, purchase_date).
+    """
+    from .models import PurchasePriceStats
+
+    for item_id, supplier_id in keys:
+        rows = _purchases(item_id, supplier_id).order_by('purchase_date', 'id').values_list(
+            'purchase_date', 'unit_price', 'quantity_purchased'
+        )
+        values = _stats_from_rows(rows)
+        if values is None:
+            _stats(item_id, supplier_id).delete()
+            continue
+        PurchasePriceStats.objects.update_or_create(item_id=item_id, supplier_id=supplier_id, defaults=values)
+
+
+def _stats_from_rows(rows):
+    """
+    Estadísticas de una clave a partir de sus compras ordenadas por fecha, en una
+    sola pasada (la ventana móvil se mantiene con una cola).
+    """
+    count = 0
+    total_quantity = total_cost = Decimal('0')
+    min_price = max_price = last_price = last_date = None
+    window = deque()
+    window_quantity = window_cost = Decimal('0')
+
+    for purchase_date, price, quantity in rows:
+        count += 1
+        total_quantity += quantity
+        total_cost += price * quantity
+        min_price = price if min_price is None else min(min_price, price)
+        max_price = price if max_price is None else max(max_price, price)
+        last_price, last_date = price, purchase_date
+
+        window.append((purchase_date, price * quantity, quantity))
+        window_quantity += quantity
+        window_cost += price * quantity
+        while window[0][0] <= purchase_date - timedelta(days=MOVING_AVERAGE_DAYS):
+            _, old_cost, old_quantity = window.popleft()
+            window_quantity -= old_quantity
+            window_cost -= old_cost
+
+    if not count:
+        return None
+    return {
+        'purchase_count': count,
+        'total_quantity': total_quantity,
+        'total_cost': total_cost,
+        'avg_unit_cost': _average(total_cost, total_quantity),
+        'min_price': min_price,
+        'max_price': max_price,
+        'last_price': last_price,
+        'last_purchase_date': last_date,
+        'moving_avg_90d': _average(window_cost, window_quantity),
+    }
+
+
+def rebuild_price_stats(item_ids=None, apps=None):
+    """
+    Reconstruye PurchasePriceStats desde cero (o solo para item_ids) recorriendo el
+    historial de compras una vez, ordenado por clave. `apps` es el registro de
+    modelos históricos cuando se llama desde una migración. Devuelve el número
+    de filas creadas.
+    """
+    if apps is not None:
+        PurchasePriceStats = apps.get_model('inventory', 'PurchasePriceStats')
+        PurchaseRecord = apps.get_model('inventory', 'PurchaseRecord')
+    else:
+        from .models import PurchasePriceStats, PurchaseRecord
+
+    purchases = PurchaseRecord.objects.all()
+    stats = PurchasePriceStats.objects.all()
+    if item_ids is not None:
+        purchases = purchases.filter(item_id__in=item_ids)
+        stats = stats.filter(item_id__in=item_ids)
+
+    # Claves: (ítem, None) con todas las compras del ítem y (ítem, proveedor)
+    groups = {}
+    rows = purchases.order_by('item_id', 'purchase_date', 'id').values_list(
+        'item_id', 'supplier_id', 'purchase_date', 'unit_price', 'quantity_purchased'
+    )
+    for item_id, supplier_id, purchase_date, price, quantity in rows.iterator(chunk_size=5000):
+        for key in stats_keys(item_id, supplier_id):
+            groups.setdefault(key, []).append((purchase_date, price, quantity))
+
+    objects = [
+        PurchasePriceStats(item_id=item_id, supplier_id=supplier_id, **_stats_from_rows(group))
+        for (item_id, supplier_id), group in groups.items()
+    ]
+    with transaction.atomic():
+        stats.delete()
+        PurchasePriceStats.objects.bulk_create(objects, batch_size=1000)
+    return len(objects)
@@ -0,0 +1,117 @@
+# backend/inventory/renderers.py
+
+import datetime
+import decimal
+import json
+import re
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson # Opcional: codificador JSON acelerado
+except ImportError:
+    orjson = None
+
+# Codificación JSON rápida con la misma salida, byte a byte, que JSONRenderer de DRF.
+#
+# - Decimal, datetime y date (los tipos que más aparecen en reportes y
+#   valorizaciones) se convierten con un diccionario por tipo exacto, en lugar de
+#   la cadena de isinstance() de rest_framework.utils.encoders.JSONEncoder, que
+#   sigue atendiendo todos los demás tipos.
+# - Si orjson está instalado se usa para el documento completo. Sus floats no
+#   siempre se escriben como repr() (1e16 frente a 1e+16, 0.00001 frente a
+#   1e-05): si la salida puede contener uno de esos números se vuelve a generar
+#   con la biblioteca estándar. Lo mismo ante cualquier error de orjson (claves
+#   no textuales, enteros de más de 64 bits, Decimal no finito...), de modo que
+#   los errores y su mensaje son los de siempre.
+# - Única diferencia conocida: un float nativo NaN/Infinity se escribe como null
+#   con orjson, en lugar de fallar. Los Decimal no finitos sí fallan como antes.
+
+_SEPARATORS = (',', ':')
+
+# Números que orjson escribe distinto que repr(): con exponente (1e16, 1.5e-7) o
+# menores que 1e-4 sin él (0.000015). Pueden coincidir dentro de un texto
+# ("Bodega 2e-1"), lo que solo provoca la vuelta a la biblioteca estándar. La
+# expresión empieza por un literal para que re lo busque rápido.
+_FLOAT_EXPONENT = re.compile(rb'e(?<=[0-9]e)[-0-9]')
+_FLOAT_SMALL = b'0.0000'
+
+_drf_encoder = JSONEncoder()
+
+
+def _encode_datetime(value):
+    representation = value.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+def _encode_decimal(value):
+    # Igual que DRF: los serializers ya entregan los Decimal como texto; los que
+    # llegan sin serializar (p. ej. en la valorización) se escriben como número
+    if not value.is_finite():
+        raise ValueError("Out of range float values are not JSON compliant")
+    return float(value)
+
+
+_ENCODERS = {
+    decimal.Decimal: _encode_decimal,
+    datetime.datetime: _encode_datetime,
+    datetime.date: datetime.date.isoformat,
+}
+
+
+def encode_default(obj):
+    """
+    Hook `default` de json/orjson: tipos frecuentes por diccionario, el resto como DRF.
+    """
+    encode = _ENCODERS.get(type(obj))
+    if encode is not None:
+        return encode(obj)
+    return _drf_encoder.default(obj)
+
+
+def _stdlib_json(data, allow_nan):
+    return json.dumps(
+        data, default=encode_default, ensure_ascii=False, allow_nan=allow_nan, separators=_SEPARATORS,
+    ).encode('utf-8')
+
+
+def encode_json(data, allow_nan=True, accelerated=True):
+    """
+    JSON compacto en UTF-8 (bytes), idéntico a json.dumps con el JSONEncoder de DRF.
+    accelerated=False fuerza la biblioteca estándar.
+    """
+    if accelerated and orjson is not None:
+        try:
+            content = orjson.dumps(
+                data, default=encode_default,
+                # Fechas y dataclasses pasan por encode_default, como en DRF
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            if _FLOAT_SMALL not in content and not _FLOAT_EXPONENT.search(content):
+                return content
+    return _stdlib_json(data, allow_nan)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer con encode_json. Las respuestas con sangría (?indent / API
+    navegable) o con ensure_ascii usan el JSONRenderer de DRF sin cambios.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = encode_json(data, allow_nan=not self.strict)
+        # Igual que DRF: U+2028/U+2029 escapados, por compatibilidad con JavaScript
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
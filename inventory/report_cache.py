@@ -0,0 +1,173 @@
+# backend/inventory/report_cache.py
+
+import hashlib
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Subquery
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+# Única fila de DataVersion
+DATA_VERSION_ROW = 1
+
+# Cabeceras que se guardan junto con el contenido del reporte
+_CACHED_HEADERS = ('Content-Type', 'Content-Disposition')
+
+
+def _cache():
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'default')]
+
+
+def bump_data_version(**kwargs):
+    """
+    Incrementa la versión de los datos (fila de DataVersion) con un UPDATE en la
+    transacción del cambio, así la ven todos los procesos. Se llama desde las
+    señales de models.py ante cambios que no mueven las marcas de agua.
+    """
+    from .models import DataVersion
+
+    now = timezone.now()
+    updated = DataVersion.objects.filter(pk=DATA_VERSION_ROW).update(version=F('version') + 1, changed_at=now)
+    if not updated:
+        DataVersion.objects.get_or_create(pk=DATA_VERSION_ROW, defaults={'version': 1, 'changed_at': now})
+
+
+def data_generation():
+    """
+    (versión, instante Unix del último cambio señalado o None) de la fila de
+    DataVersion, en una consulta por clave primaria.
+    """
+    from .models import DataVersion
+
+    row = DataVersion.objects.filter(pk=DATA_VERSION_ROW).values_list('version', 'changed_at').first()
+    if row is None:
+        return 0, None
+    version, changed_at = row
+    return version, changed_at and changed_at.timestamp()
+
+
+def _latest(model, field):
+    # ORDER BY ... LIMIT 1 sobre un índice: no recorre la tabla
+    return Subquery(model.objects.order_by(f'-{field}').values(field)[:1])
+
+
+def data_version():
+    """
+    Versión de los datos de los reportes, leída solo de la base de datos para que
+    todos los procesos calculen la misma: la fila de DataVersion más el último
+    updated_at e id de ítems y de estadísticas de precios (valorización). Los
+    movimientos no se consultan: el motor de stock actualiza updated_at del ítem
+    en cada alta o baja, y la edición de un movimiento incrementa DataVersion.
+    Una sola consulta con subconsultas indexadas.
+    """
+    from .models import DataVersion, InventoryItem, PurchasePriceStats
+
+    marks = (
+        DataVersion.objects.filter(pk=DATA_VERSION_ROW)
+        .annotate(
+            item_updated=_latest(InventoryItem, 'updated_at'),
+            item_id=_latest(InventoryItem, 'id'),
+            stats_updated=_latest(PurchasePriceStats, 'updated_at'),
+            stats_id=_latest(PurchasePriceStats, 'id'),
+        )
+        .values_list('version', 'item_updated', 'item_id', 'stats_updated', 'stats_id')
+        .first()
+    )
+    if marks is None:
+        # Base de datos sin la fila (p. ej. vaciada con flush): se crea y se vuelve a leer
+        bump_data_version()
+        return data_version()
+    return '|'.join(str(mark) for mark in marks)
+
+
+def report_etag(query_params):
+    """
+    ETag del reporte: tipo, formato y parámetros normalizados + versión de los datos.
+    Se incluye la fecha del día porque expiring_soon/stock_as_of dependen de 'hoy'.
+    """
+    params = sorted((key, value) for key, value in query_params.items() if key != 'async')
+    raw = f"{params}|{date.today()}|{data_version()}"
+    return '"' + hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in [tag.strip().removeprefix('W/') for tag in header.split(',')]
+
+
+def _finish(response, etag):
+    response['ETag'] = etag
+    # El cliente debe revalidar siempre (If-None-Match) antes de reutilizar su copia
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def cached_report_response(request, etag):
+    """
+    Devuelve 304 si el cliente ya tiene esta versión, la respuesta cacheada si
+    existe, o None si hay que generar el reporte.
+    """
+    if _etag_matches(request, etag):
+        return _finish(HttpResponseNotModified(), etag)
+
+    cached = _cache().get('inventory:report:' + etag)
+    if cached is None:
+        return None
+    content, headers = cached
+    response = HttpResponse(content)
+    for header, value in headers.items():
+        response[header] = value
+    response['X-Report-Cache'] = 'HIT'
+    return _finish(response, etag)
+
+
+def store_report_response(response, etag):
+    """
+    Guarda el contenido del reporte en la caché cuando termina de generarse.
+    Las respuestas DRF se guardan tras renderizarse; las streaming se copian
+    mientras se envían y se descartan si superan REPORT_CACHE_MAX_BYTES.
+    """
+    if response.status_code != 200:
+        return response
+
+    key = 'inventory:report:' + etag
+    timeout = getattr(settings, 'REPORT_CACHE_TIMEOUT', 3600)
+    max_bytes = getattr(settings, 'REPORT_CACHE_MAX_BYTES', 20 * 1024 * 1024)
+
+    def headers_of(resp):
+        return {header: resp[header] for header in _CACHED_HEADERS if resp.has_header(header)}
+
+    if response.streaming:
+        original = response.streaming_content
+
+        def tee():
+            parts, size = [], 0
+            for chunk in original:
+                if parts is not None:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        # No se cacheará: se suelta lo copiado y el resto solo se envía
+                        parts = None
+                    else:
+                        parts.append(chunk)
+                yield chunk
+            if parts is not None:
+                _cache().set(key, (b''.join(parts), headers_of(response)), timeout)
+
+        response.streaming_content = tee()
+    elif hasattr(response, 'add_post_render_callback'):
+        def store(rendered):
+            if len(rendered.content) <= max_bytes:
+                _cache().set(key, (rendered.content, headers_of(rendered)), timeout)
+
+        response.add_post_render_callback(store)
+
+    response['X-Report-Cache'] = 'MISS'
+    return _finish(response, etag)
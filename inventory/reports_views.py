@@ -4,9 +4,22 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.renderers import JSONRenderer, BaseRenderer
-from .models import InventoryItem, InventoryMovement # Assuming Category and Supplier are imported via InventoryItem
-from .serializers import InventoryItemSerializer, InventoryMovementSerializer
+from rest_framework.renderers import BaseRenderer
+from .models import EXPIRING_SOON_DAYS, InventoryItem, InventoryMovement # Assuming Category and Supplier are imported via InventoryItem
+from rest_framework.reverse import reverse
+from .serializers import InventoryItemSerializer, InventoryMovementSerializer, InventoryValuationSerializer, ReportJobSerializer
+from .jobs import create_report_job
+from .report_cache import cached_report_response, report_etag, store_report_response
+from .snapshots import day_bounds, parse_as_of, stock_as_of
+from .valuation import VALUATION_METHODS, inventory_valuation
+from .row_serializers import row_serializer
+from .renderers import FastJSONRenderer, encode_json
+from .streaming import iter_ndjson, iter_json_envelope
+from .exports import (
+    ITEM_EXPORT_HEADERS, MOVEMENT_EXPORT_HEADERS, STOCK_AS_OF_EXPORT_HEADERS, VALUATION_EXPORT_HEADERS,
+    item_export_rows, movement_export_rows, iter_csv, iter_xlsx,
+)
+from django.http import StreamingHttpResponse
 from datetime import datetime, timedelta, date
 from django.db import models 
 
@@ -29,73 +42,197 @@ class PassthroughPDFRenderer(BaseRenderer):
         return data
 
 
+class NDJSONRenderer(BaseRenderer):
+    """
+    Necesario para que ?format=ndjson pase la negociación de contenido. Las filas
+    se envían con StreamingHttpResponse; este renderer solo se usa para respuestas
+    de error, que se emiten como una única línea JSON.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, media_type=None, renderer_context=None):
+        return encode_json(data) + b'\n'
+
+
+class SpreadsheetRenderer(BaseRenderer):
+    """
+    Las exportaciones CSV/XLSX se envían con StreamingHttpResponse; este renderer
+    solo permite ?format=csv / ?format=xlsx en la negociación y emite los errores como JSON.
+    """
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, media_type=None, renderer_context=None):
+        return encode_json(data)
+
+
+class CSVRenderer(SpreadsheetRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class XLSXRenderer(SpreadsheetRenderer):
+    media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    format = 'xlsx'
+
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+ITEM_REPORT_TITLES = {
+    'current_stock': 'Reporte de Stock Actual',
+    'low_stock': 'Reporte de Ítems con Stock Bajo',
+    'expiring_soon': 'Reporte de Ítems por Vencer Pronto',
+}
+
+ITEM_REPORT_MESSAGES = {
+    'current_stock': 'Reporte de stock actual generado exitosamente.',
+    'low_stock': 'Reporte de ítems con stock bajo generado exitosamente.',
+    'expiring_soon': 'Reporte de ítems por vencer pronto generado exitosamente.',
+}
+
+
 class InventoryReportView(APIView):
     permission_classes = [IsAuthenticated]
-    renderer_classes = [JSONRenderer, PassthroughPDFRenderer]
+    renderer_classes = [FastJSONRenderer, PassthroughPDFRenderer, NDJSONRenderer, CSVRenderer, XLSXRenderer]
+
+    def item_report_queryset(self, report_type):
+        # Las relaciones que lee InventoryItemSerializer se cargan en bloque (sin N+1)
+        items = InventoryItem.objects.with_status().select_related('category', 'supplier').prefetch_related('tags')
+
+        if report_type == 'low_stock':
+            return items.low_stock()
+
+        if report_type == 'expiring_soon':
+            return items.expiring_within(EXPIRING_SOON_DAYS)
+
+        return items
+
+    def movement_history_queryset(self, start_date=None, end_date=None, item_id=None, movement_type=None):
+        # Rangos [inicio del día, inicio del día siguiente) sobre la columna, sin
+        # movement_date__date, para que el filtro pueda usar los índices por fecha
+        movements = InventoryMovement.objects.select_related('item', 'moved_by').order_by('-movement_date')
+        if start_date:
+            movements = movements.filter(movement_date__gte=day_bounds(start_date)[0])
+        if end_date:
+            movements = movements.filter(movement_date__lt=day_bounds(end_date)[1])
+        if item_id:
+            movements = movements.filter(item_id=item_id)
+        if movement_type:
+            movements = movements.filter(movement_type=movement_type)
+        return movements
 
     def get(self, request, *args, **kwargs):
         report_type = request.query_params.get('report_type')
         report_format = request.query_params.get('format', 'json')
-        
+
+        if request.query_params.get('async', 'false').lower() == 'true':
+            return self.enqueue_job(request, report_type, report_format)
+
+        # Caché por versión de datos: 304 si el cliente ya tiene esta versión,
+        # o los bytes guardados si el reporte ya se generó con los mismos datos.
+        etag = report_etag(request.query_params)
+        cached = cached_report_response(request, etag)
+        if cached is not None:
+            return cached
+        return store_report_response(self.build_report(request), etag)
+
+    def build_report(self, request):
+        report_type = request.query_params.get('report_type')
+        report_format = request.query_params.get('format', 'json')
+
         data = []
         message = ""
         
         try:
-            if report_type == 'current_stock':
-                items = InventoryItem.objects.all()
-                serializer = InventoryItemSerializer(items, many=True)
-                data = serializer.data
-                message = 'Reporte de stock actual generado exitosamente.'
-
-            elif report_type == 'low_stock':
-                items = InventoryItem.objects.filter(quantity__lte=models.F('low_stock_threshold'))
-                serializer = InventoryItemSerializer(items, many=True)
-                data = serializer.data
-                message = 'Reporte de ítems con stock bajo generado exitosamente.'
-
-            elif report_type == 'expiring_soon':
-                today = date.today()
-                expiring_threshold_date_6_months = today + timedelta(days=180)
-                
-                items = InventoryItem.objects.filter(
-                    expiration_date__gte=today,
-                    expiration_date__lte=expiring_threshold_date_6_months
-                )
-                serializer = InventoryItemSerializer(items, many=True)
-                data = serializer.data
-                message = 'Reporte de ítems por vencer pronto generado exitosamente.'
+            if report_type in ITEM_REPORT_TITLES:
+                items = self.item_report_queryset(report_type)
+                if report_format in EXPORT_FORMATS:
+                    return self.export_response(report_type, report_format, ITEM_EXPORT_HEADERS, item_export_rows(items))
+                data = row_serializer(InventoryItemSerializer).serialize_queryset(items)
+                message = ITEM_REPORT_MESSAGES[report_type]
 
             elif report_type == 'movement_history':
                 start_date_str = request.query_params.get('start_date')
                 end_date_str = request.query_params.get('end_date')
                 item_id = request.query_params.get('item_id')
                 movement_type = request.query_params.get('movement_type')
-                movements = InventoryMovement.objects.all().order_by('-movement_date')
+                start_date = end_date = None
 
                 if start_date_str:
                     try:
                         start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-                        movements = movements.filter(movement_date__date__gte=start_date)
                     except ValueError:
                         return Response({"error": "Formato de fecha de inicio inválido. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
                 
                 if end_date_str:
                     try:
                         end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-                        movements = movements.filter(movement_date__date__lte=end_date)
                     except ValueError:
                         return Response({"error": "Formato de fecha de fin inválido. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
-                
-                if item_id:
-                    movements = movements.filter(item_id=item_id)
-                
-                if movement_type:
-                    movements = movements.filter(movement_type=movement_type)
 
-                serializer = InventoryMovementSerializer(movements, many=True)
-                data = serializer.data
+                movements = self.movement_history_queryset(start_date, end_date, item_id, movement_type)
+
+                if report_format in EXPORT_FORMATS:
+                    return self.export_response(report_type, report_format, MOVEMENT_EXPORT_HEADERS, movement_export_rows(movements))
+
+                stream = request.query_params.get('stream', 'false').lower() == 'true'
+                if report_format == 'ndjson' or (report_format == 'json' and stream):
+                    return self.stream_rows(
+                        report_type, report_format,
+                        movements, InventoryMovementSerializer,
+                        'Reporte de historial de movimientos generado exitosamente.',
+                    )
+
+                data = row_serializer(InventoryMovementSerializer).serialize_queryset(movements)
                 message = 'Reporte de historial de movimientos generado exitosamente.'
 
+            elif report_type == 'stock_as_of':
+                as_of_str = request.query_params.get('date')
+                item_id = request.query_params.get('item_id')
+                if not as_of_str:
+                    return Response({"error": "Debe indicar el parámetro 'date' (YYYY-MM-DD o fecha y hora ISO)."}, status=status.HTTP_400_BAD_REQUEST)
+                try:
+                    as_of_day, as_of_moment = parse_as_of(as_of_str)
+                except ValueError:
+                    return Response({"error": "Formato de fecha inválido. Use YYYY-MM-DD o fecha y hora ISO."}, status=status.HTTP_400_BAD_REQUEST)
+
+                items = InventoryItem.objects.all()
+                if item_id:
+                    items = items.filter(pk=item_id)
+                quantities = stock_as_of(as_of_day, as_of_moment, item_ids=items.values('pk'))
+                data = [
+                    {
+                        'item': pk,
+                        'item_name': name,
+                        'as_of': as_of_str,
+                        'quantity': quantities[pk],
+                    }
+                    for pk, name in items.values_list('pk', 'name')
+                    if pk in quantities
+                ]
+                if report_format in EXPORT_FORMATS:
+                    rows = ((row['item'], row['item_name'], row['as_of'], row['quantity']) for row in data)
+                    return self.export_response(report_type, report_format, STOCK_AS_OF_EXPORT_HEADERS, rows)
+                message = 'Reporte de stock a la fecha generado exitosamente.'
+
+            elif report_type == 'valuation':
+                method = request.query_params.get('method', 'weighted_average')
+                if method not in VALUATION_METHODS:
+                    return Response({"error": f"Método de valorización inválido. Use uno de: {', '.join(VALUATION_METHODS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+                data = inventory_valuation(method)
+                if report_format in EXPORT_FORMATS:
+                    rows = (
+                        (row['item'], row['item_name'], row['category_name'], row['supplier_name'],
+                         row['quantity'], row['unit_cost'], row['value'], row['unvalued_quantity'])
+                        for row in data['items']
+                    )
+                    return self.export_response(report_type, report_format, VALUATION_EXPORT_HEADERS, rows)
+                data = InventoryValuationSerializer(data).data
+                message = 'Reporte de valorización de inventario generado exitosamente.'
+
             else:
                 return Response({"error": "Tipo de reporte inválido."}, status=status.HTTP_400_BAD_REQUEST)
         
@@ -128,18 +265,71 @@ class InventoryReportView(APIView):
             'message': message
         }, status=status.HTTP_200_OK)
 
+    def enqueue_job(self, request, report_type, report_format):
+        """
+        ?async=true: registra un ReportJob y responde 202 de inmediato; el archivo
+        se descarga luego desde /api/report-jobs/<id>/download/.
+        """
+        # La respuesta es JSON aunque se haya pedido ?format=pdf/csv/xlsx para el archivo
+        request.accepted_renderer = FastJSONRenderer()
+        request.accepted_media_type = FastJSONRenderer.media_type
+
+        params = {
+            key: value for key, value in request.query_params.items()
+            if key not in ('report_type', 'format', 'async')
+        }
+        serializer = ReportJobSerializer(
+            data={'report_type': report_type, 'report_format': report_format, 'params': params},
+            context={'request': request},
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        job = create_report_job(request.user, report_type, report_format, params)
+        response = Response(ReportJobSerializer(job, context={'request': request}).data, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = reverse('reportjob-detail', args=[job.pk], request=request)
+        return response
+
+    def export_response(self, report_type, report_format, headers, rows):
+        """
+        Exportación CSV o XLSX generada fila a fila con StreamingHttpResponse.
+        """
+        filename = f'{report_type}_report_{datetime.now().strftime("%Y%m%d%H%M%S")}.{report_format}'
+        if report_format == 'csv':
+            response = StreamingHttpResponse(iter_csv(headers, rows), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(
+                iter_xlsx(headers, rows, sheet_name=report_type),
+                content_type=XLSXRenderer.media_type,
+            )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def stream_rows(self, report_type, report_format, queryset, serializer_class, message):
+        """
+        Respuesta streaming: las filas se leen con .iterator() por bloques y se
+        escriben a medida que se serializan, así la memoria no crece con el reporte.
+        format=ndjson emite una fila por línea; format=json&stream=true emite el
+        mismo objeto que la respuesta JSON normal.
+        """
+        rows = row_serializer(serializer_class).iter_serialized(queryset)
+        if report_format == 'ndjson':
+            response = StreamingHttpResponse(iter_ndjson(rows), content_type='application/x-ndjson; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(
+                iter_json_envelope(rows, report_type=report_type, message=message),
+                content_type='application/json; charset=utf-8',
+            )
+        response['X-Accel-Buffering'] = 'no' # Evitar que un proxy acumule la respuesta completa
+        return response
+
     def generate_item_report_pdf(self, report_type, data):
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter)
         styles = getSampleStyleSheet()
         elements = []
 
-        title_map = {
-            'current_stock': 'Reporte de Stock Actual',
-            'low_stock': 'Reporte de Ítems con Stock Bajo',
-            'expiring_soon': 'Reporte de Ítems por Vencer Pronto',
-        }
-        elements.append(Paragraph(title_map.get(report_type, 'Reporte de Inventario'), styles['h1']))
+        elements.append(Paragraph(ITEM_REPORT_TITLES.get(report_type, 'Reporte de Inventario'), styles['h1']))
         elements.append(Paragraph(f"Fecha de Generación: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['h3']))
         elements.append(Spacer(1, 0.2 * inch))
 
@@ -0,0 +1,118 @@
+# backend/inventory/response_cache.py
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+# Caché de respuestas de los catálogos de referencia (categorías, etiquetas,
+# proveedores, usuarios). Cada modelo tiene una generación que se incrementa con
+# sus señales post_save/post_delete: las claves la incluyen, así que un cambio
+# descarta solo las respuestas de ese modelo, sin recorrer ni borrar claves.
+
+_PREFIX = 'inventory:refcache:'
+
+
+def _cache():
+    return caches[getattr(settings, 'REFERENCE_CACHE_ALIAS', 'default')]
+
+
+def _version_key(label):
+    return f'{_PREFIX}version:{label}'
+
+
+def _counter_key(label, outcome):
+    return f'{_PREFIX}stats:{label}:{outcome}'
+
+
+def bump_reference_version(sender, **kwargs):
+    """
+    Receptor de señales: invalida las respuestas cacheadas que dependen de `sender`.
+    """
+    cache = _cache()
+    key = _version_key(sender._meta.label_lower)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def _count(label, outcome):
+    cache = _cache()
+    key = _counter_key(label, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def reference_cache_stats(labels):
+    """
+    {modelo: {'hits': n, 'misses': n}} de los contadores acumulados en la caché.
+    """
+    keys = {(label, outcome): _counter_key(label, outcome) for label in labels for outcome in ('hit', 'miss')}
+    values = _cache().get_many(list(keys.values()))
+    return {
+        label: {
+            'hits': values.get(keys[(label, 'hit')], 0),
+            'misses': values.get(keys[(label, 'miss')], 0),
+        }
+        for label in labels
+    }
+
+
+class ReferenceCacheMixin:
+    """
+    Caché read-through para list y retrieve. La clave combina la generación de
+    los modelos de `cache_models` (por defecto, el del queryset), la ruta con su
+    query string y, con `cache_vary_on_role`, el rol del usuario. Los permisos se
+    verifican antes (en initial()), así que una respuesta cacheada nunca se
+    entrega a quien no podría obtenerla. Solo se cachean respuestas JSON 200: el
+    navegador de la API incluye datos de la sesión.
+    La cabecera X-Reference-Cache indica HIT o MISS.
+    """
+    cache_models = None
+    cache_vary_on_role = False
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(ReferenceCacheMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(ReferenceCacheMixin, self).retrieve(request, *args, **kwargs))
+
+    def get_cache_models(self):
+        return self.cache_models or (self.get_queryset().model,)
+
+    def cached_response(self, request, build):
+        if request.accepted_renderer.format != 'json':
+            return build()
+
+        cache = _cache()
+        label = self.get_queryset().model._meta.label_lower
+        version_keys = [_version_key(model._meta.label_lower) for model in self.get_cache_models()]
+        versions = cache.get_many(version_keys)
+        raw = '|'.join([
+            request.get_full_path(),
+            getattr(request.user, 'role', '') if self.cache_vary_on_role else '',
+            *(f'{key}={versions.get(key, 0)}' for key in version_keys),
+        ])
+        key = f'{_PREFIX}response:{label}:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+        cached = cache.get(key)
+        if cached is not None:
+            _count(label, 'hit')
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Reference-Cache'] = 'HIT'
+            return response
+
+        _count(label, 'miss')
+        response = build()
+        if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            def store(rendered):
+                cache.set(key, (rendered.content, rendered['Content-Type']), getattr(settings, 'REFERENCE_CACHE_TIMEOUT', 3600))
+
+            response.add_post_render_callback(store)
+        response['X-Reference-Cache'] = 'MISS'
+        return response
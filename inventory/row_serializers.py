@@ -0,0 +1,181 @@
+# backend/inventory/row_serializers.py
+
+from functools import lru_cache
+
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+from .streaming import STREAM_CHUNK_SIZE
+
+# Ruta rápida de solo lectura para listados grandes: produce exactamente la misma
+# salida que un ModelSerializer, pero a partir de filas de .values(). Por cada
+# campo del serializer se prepara una sola vez qué columna leer y cómo
+# convertirla, en lugar de recorrer por fila la maquinaria de campos de DRF
+# (get_attribute con fuentes "a.b", SerializerMethodField, DecimalField...).
+#
+# Los campos cuya fuente no es una columna (SerializerMethodField) se declaran en
+# Meta.values_sources del serializer: {campo: columna o anotación de .values()}.
+
+
+def _converter(field):
+    """
+    Función columna → valor serializado, o None si el valor se emite tal cual
+    (texto, enteros, booleanos, ids de relaciones, opciones).
+    """
+    if isinstance(field, serializers.DecimalField):
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if coerce_to_string and not field.localize and not field.normalize_output:
+            quantize = field.quantize
+            return lambda value: '{:f}'.format(quantize(value))
+        return field.to_representation
+    if isinstance(field, (serializers.DateTimeField, serializers.DateField, serializers.TimeField)):
+        return field.to_representation
+    if isinstance(field, (serializers.FloatField, serializers.UUIDField, serializers.DurationField)):
+        return field.to_representation
+    return None
+
+
+class RowSerializer:
+    """
+    Versión compilada de un ModelSerializer para filas de .values(), con todos sus
+    campos o solo `field_names` (?fields= / ?omit=). Úsese con row_serializer(),
+    que la construye una vez por clase y selección de campos.
+    """
+    def __init__(self, serializer_class, field_names=None):
+        serializer = serializer_class()
+        model = serializer_class.Meta.model
+        values_sources = getattr(serializer_class.Meta, 'values_sources', {})
+
+        self.columns = []
+        self.plan = [] # (nombre, tipo, columna, conversor, columna que debe existir)
+        self.many = {} # nombre → (modelo intermedio, columna del origen, columna del destino, orden)
+        for name, field in serializer.fields.items():
+            if field.write_only or (field_names is not None and name not in field_names):
+                continue
+            if isinstance(field, ManyRelatedField):
+                relation = model._meta.get_field(field.source)
+                through = relation.remote_field.through
+                source_column = f'{relation.m2m_field_name()}_id'
+                target_column = f'{relation.m2m_reverse_field_name()}_id'
+                # Mismo orden que el prefetch: el orden por defecto del modelo relacionado
+                ordering = [
+                    f'{relation.m2m_reverse_field_name()}__{order}' for order in relation.related_model._meta.ordering
+                ]
+                self.many[name] = (through, source_column, target_column, ordering)
+                self.plan.append((name, 'many', None, None, None))
+                continue
+
+            if name in values_sources:
+                column, guard = values_sources[name], None
+            elif field.source == '*':
+                raise ValueError(f"{serializer_class.__name__}.{name} necesita Meta.values_sources")
+            else:
+                path = field.source.split('.')
+                column = '__'.join(path)
+                # Con "a.b" y la relación a vacía, DRF omite el campo (SkipField)
+                guard = path[0] if len(path) > 1 else None
+            for needed in (column, guard):
+                if needed and needed not in self.columns:
+                    self.columns.append(needed)
+            self.plan.append((name, 'column', column, _converter(field), guard))
+        if self.many:
+            self.columns.append('pk')
+
+    def values(self, queryset, extra=()):
+        """
+        El queryset como filas de .values() con las columnas que necesita la salida
+        y las de `extra` (p. ej. las que lee un paginador por cursor).
+        """
+        columns = self.columns + [column for column in extra if column not in self.columns]
+        return queryset.prefetch_related(None).values(*columns)
+
+    def _many_values(self, rows):
+        if not self.many or not rows:
+            return {}
+        ids = [row['pk'] for row in rows]
+        result = {}
+        for name, (through, source_column, target_column, ordering) in self.many.items():
+            related = {pk: [] for pk in ids}
+            for source, target in (
+                through.objects.filter(**{f'{source_column}__in': ids})
+                .order_by(*ordering, target_column).values_list(source_column, target_column)
+            ):
+                related[source].append(target)
+            result[name] = related
+        return result
+
+    def serialize(self, rows):
+        """
+        Lista de filas de .values() → lista de diccionarios como los del ModelSerializer.
+        """
+        many = self._many_values(rows)
+        output = []
+        for row in rows:
+            data = {}
+            for name, kind, column, convert, guard in self.plan:
+                if kind == 'many':
+                    data[name] = many[name][row['pk']]
+                    continue
+                if guard is not None and row[guard] is None:
+                    continue
+                value = row[column]
+                data[name] = value if value is None or convert is None else convert(value)
+            output.append(data)
+        return output
+
+    def serialize_queryset(self, queryset):
+        return self.serialize(list(self.values(queryset)))
+
+    def iter_serialized(self, queryset, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Como streaming.iter_serialized, por bloques de chunk_size filas (una
+        consulta adicional por bloque para las relaciones muchos a muchos).
+        """
+        chunk = []
+        for row in self.values(queryset).iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield from self.serialize(chunk)
+                chunk = []
+        if chunk:
+            yield from self.serialize(chunk)
+
+
+@lru_cache(maxsize=256)
+def row_serializer(serializer_class, field_names=None):
+    return RowSerializer(serializer_class, field_names)
+
+
+class RowListMixin:
+    """
+    list() de solo lectura con la ruta rápida: pagina las filas de .values()
+    (PageNumberPagination y KeysetPagination aceptan diccionarios) y las serializa
+    con get_row_serializer(). Con campos expandidos (?expand=, objetos anidados)
+    se usa el list() normal.
+    """
+    def get_row_serializer(self):
+        """
+        El RowSerializer para los campos de get_serializer(), o None si alguno es un serializer anidado.
+        """
+        fields = self.get_serializer().fields
+        if any(isinstance(field, BaseSerializer) for field in fields.values()):
+            return None
+        return row_serializer(self.get_serializer_class(), tuple(fields))
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_row_serializer()
+        if rows is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Los paginadores por cursor leen de cada fila las columnas de su orden
+        extra = ()
+        if hasattr(self.paginator, 'get_ordering'):
+            extra = [order.lstrip('-') for order in self.paginator.get_ordering(request, queryset, self)]
+        queryset = rows.values(queryset, extra)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(list(queryset)))
@@ -0,0 +1,137 @@
+# backend/inventory/search.py
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+# Índice de texto de los ítems (ver migración 0009_item_search):
+# - SQLite: tabla virtual FTS5 con una copia de los campos de texto, mantenida
+#   por las señales de InventoryItem (index_item / unindex_item).
+# - PostgreSQL: índice GIN sobre una expresión tsvector y un índice trigram sobre
+#   el nombre; se actualizan solos con cada escritura de la fila.
+# - Otros motores: icontains sobre los mismos campos, sin ranking.
+SEARCH_FIELDS = ('name', 'serial_number', 'location', 'description')
+FTS_TABLE = 'inventory_item_fts'
+
+# Pesos por campo (mismo orden que SEARCH_FIELDS); bm25 da mejor puntaje al nombre y al N° de serie
+_FTS_WEIGHTS = (10.0, 10.0, 2.0, 1.0)
+
+# Debe coincidir con la expresión del índice inv_item_search_idx
+_PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(serial_number, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+def search_terms(query):
+    """
+    Palabras de la búsqueda. Solo caracteres de palabra: el resto de la sintaxis
+    de FTS5 / tsquery nunca llega a la consulta.
+    """
+    return re.findall(r'\w+', query or '')
+
+
+def _fts_values(instance):
+    return [getattr(instance, field) or '' for field in SEARCH_FIELDS]
+
+
+def index_item(sender, instance, **kwargs):
+    """
+    Receptor de señales (post_save de InventoryItem): reemplaza la fila del ítem en el índice FTS5.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [instance.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s)",
+            [instance.pk, *_fts_values(instance)],
+        )
+
+
+def unindex_item(sender, instance, **kwargs):
+    """
+    Receptor de señales (post_delete de InventoryItem).
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [instance.pk])
+
+
+def rebuild_search_index():
+    """
+    Reconstruye el índice FTS5 desde la tabla de ítems, para cargas que no
+    disparan señales (bulk_create, QuerySet.update). Devuelve las filas indexadas.
+    En PostgreSQL el índice es una expresión sobre la tabla y no hay nada que reconstruir.
+    """
+    from .models import InventoryItem
+
+    if connection.vendor != 'sqlite':
+        return InventoryItem.objects.count()
+    columns = ', '.join(SEARCH_FIELDS)
+    source = ', '.join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+            f"SELECT id, {source} FROM {InventoryItem._meta.db_table}"
+        )
+        return cursor.rowcount
+
+
+def search_item_ids(query, limit=DEFAULT_SEARCH_LIMIT, candidates=None):
+    """
+    Ids de los ítems que contienen todas las palabras de `query` (cada una como
+    prefijo: "per m8" encuentra "Perno M8x40"), del más al menos relevante.
+    `candidates` (queryset de ítems, p. ej. con filtros de estado) restringe la
+    búsqueda antes del LIMIT, dentro de la misma consulta.
+    """
+    from .models import InventoryItem
+
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    restrict, restrict_params = '', []
+    if candidates is not None:
+        subquery, restrict_params = candidates.order_by().values('pk').query.sql_with_params()
+        restrict_params = list(restrict_params)
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in _FTS_WEIGHTS)
+        if candidates is not None:
+            restrict = f"AND rowid IN ({subquery}) "
+        sql = (
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s {restrict}"
+            f"ORDER BY bm25({FTS_TABLE}, {weights}), rowid LIMIT %s"
+        )
+        params = [match, *restrict_params, limit]
+    elif connection.vendor == 'postgresql':
+        # Coincidencia por prefijo en el tsvector o nombre parecido (trigram, tolera errores de tipeo)
+        ts_query = ' & '.join(f'{term}:*' for term in terms)
+        if candidates is not None:
+            restrict = f"AND id IN ({subquery}) "
+        sql = (
+            f"SELECT id FROM {InventoryItem._meta.db_table}, to_tsquery('simple', %s) AS query "
+            f"WHERE (({_PG_DOCUMENT}) @@ query OR name %% %s) {restrict}"
+            f"ORDER BY ts_rank({_PG_DOCUMENT}, query) + similarity(name, %s) DESC, id LIMIT %s"
+        )
+        params = [ts_query, query, *restrict_params, query, limit]
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= Q(*[Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS], _connector=Q.OR)
+        items = InventoryItem.objects.all() if candidates is None else candidates
+        return list(items.filter(condition).order_by('name', 'pk').values_list('pk', flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
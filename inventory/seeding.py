@@ -0,0 +1,178 @@
+# backend/inventory/seeding.py
+
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    USER_ROLES, Category, InventoryItem, InventoryMovement, Kit, KitItem, PurchaseRecord, Supplier, Tag, UserProfile,
+)
+from .prices import rebuild_price_stats
+from .report_cache import bump_data_version
+from .response_cache import bump_reference_version
+from .search import rebuild_search_index
+from .snapshots import rebuild_daily_balances
+from .stock import MOVEMENT_SIGNS
+
+# Datos sintéticos para benchmarks: la misma semilla y la misma fecha final
+# generan exactamente el mismo conjunto de datos. Todo se inserta con
+# bulk_create (sin señales) y al final se reconstruyen los datos derivados:
+# stock de cada ítem, saldos diarios, estadísticas de precios e índice de búsqueda.
+
+NOUNS = (
+    'Perno', 'Tuerca', 'Arandela', 'Tornillo', 'Válvula', 'Cable', 'Guante', 'Filtro', 'Rodamiento',
+    'Manguera', 'Taladro', 'Sierra', 'Casco', 'Pintura', 'Bomba', 'Correa', 'Fusible', 'Soldadura',
+)
+QUALIFIERS = (
+    'M8', 'M10', 'M12', 'galvanizado', 'inoxidable', 'industrial', 'de seguridad', 'hidráulico',
+    'eléctrico', '3/4"', '1/2"', 'reforzado', 'de nitrilo', 'de alta presión',
+)
+# Pesos de los tipos de movimiento: el neto es positivo, el stock no se agota
+MOVEMENT_WEIGHTS = {'ENTRADA': 50, 'SALIDA': 38, 'TRANSFERENCIA': 4, 'DEVOLUCION': 8}
+
+
+@contextmanager
+def _explicit_movement_dates():
+    # movement_date (auto_now_add) y updated_at (auto_now): bulk_create los
+    # reemplazaría por la hora actual
+    created = InventoryMovement._meta.get_field('movement_date')
+    updated = InventoryMovement._meta.get_field('updated_at')
+    created.auto_now_add = updated.auto_now = False
+    try:
+        yield
+    finally:
+        created.auto_now_add = updated.auto_now = True
+
+
+def _decimal(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+def seed_dataset(
+    items=10000, categories=50, suppliers=100, tags=30, kits=200, movements=1000000, purchases=200000,
+    days=365, seed=42, end_date=None, batch_size=5000, log=None,
+):
+    """
+    Inserta el conjunto de datos sintético y devuelve {modelo: filas creadas}.
+    Los movimientos y compras se reparten en `days` días hasta `end_date`
+    (por defecto hoy) y se generan por bloques de `batch_size`, sin guardar la
+    lista completa en memoria.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    end_date = end_date or timezone.localdate()
+    start = timezone.make_aware(datetime.combine(end_date - timedelta(days=days), time.min))
+    span = timedelta(days=days + 1).total_seconds()
+    counts = {}
+
+    with transaction.atomic():
+        users = [UserProfile.objects.create_user(f'bench_{role.lower()}', role=role) for role, _ in USER_ROLES]
+        categories = Category.objects.bulk_create(
+            Category(name=f"Categoría {i:03d}", description=f"Categoría sintética {i}") for i in range(categories)
+        )
+        suppliers = Supplier.objects.bulk_create(
+            Supplier(name=f"Proveedor {i:04d}", contact_email=f"proveedor{i}@example.com") for i in range(suppliers)
+        )
+        tags = Tag.objects.bulk_create(Tag(name=f"Etiqueta {i:03d}") for i in range(tags))
+        counts.update(users=len(users), categories=len(categories), suppliers=len(suppliers), tags=len(tags))
+
+        item_objects = []
+        for i in range(items):
+            expires = rng.random() < 0.3
+            item_objects.append(InventoryItem(
+                name=f"{rng.choice(NOUNS)} {rng.choice(QUALIFIERS)} {i:06d}",
+                description=f"Ítem sintético {i} para pruebas de rendimiento",
+                serial_number=f"SN-{i:07d}",
+                location=f"Bodega {rng.randint(1, 8)}-{rng.randint(1, 40):02d}",
+                quantity=_decimal(rng.randint(50, 500)),
+                low_stock_threshold=_decimal(rng.randint(5, 50)),
+                purchase_price=_decimal(rng.uniform(100, 50000)),
+                expiration_date=end_date + timedelta(days=rng.randint(-30, 365)) if expires else None,
+                category=rng.choice(categories) if categories and rng.random() < 0.9 else None,
+                supplier=rng.choice(suppliers) if suppliers and rng.random() < 0.8 else None,
+            ))
+        item_objects = InventoryItem.objects.bulk_create(item_objects, batch_size=batch_size)
+        counts['items'] = len(item_objects)
+        log(f"{len(item_objects)} ítems")
+
+        through = InventoryItem.tags.through
+        item_tags = [
+            through(inventoryitem_id=item.pk, tag_id=tag.pk)
+            for item in item_objects
+            for tag in rng.sample(tags, min(len(tags), rng.randint(0, 3)))
+        ]
+        through.objects.bulk_create(item_tags, batch_size=batch_size)
+        counts['item_tags'] = len(item_tags)
+
+        kit_objects = Kit.objects.bulk_create(Kit(name=f"Kit {i:04d}", description=f"Kit sintético {i}") for i in range(kits))
+        kit_items = [
+            KitItem(kit=kit, item=item, quantity=_decimal(rng.randint(1, 4)))
+            for kit in kit_objects
+            for item in rng.sample(item_objects, min(len(item_objects), rng.randint(2, 6)))
+        ]
+        KitItem.objects.bulk_create(kit_items, batch_size=batch_size)
+        counts.update(kits=len(kit_objects), kit_items=len(kit_items))
+
+    item_ids = [item.pk for item in item_objects]
+    user_ids = [user.pk for user in users]
+    types, weights = zip(*MOVEMENT_WEIGHTS.items())
+    net = defaultdict(Decimal)
+
+    # Movimientos con fechas crecientes (como en producción, el id sigue a la fecha)
+    with _explicit_movement_dates():
+        for offset in range(0, movements, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, movements)):
+                item_id = rng.choice(item_ids)
+                movement_type = rng.choices(types, weights)[0]
+                quantity = _decimal(rng.randint(100, 2000) / 100)
+                net[item_id] += quantity * MOVEMENT_SIGNS[movement_type]
+                moment = start + timedelta(seconds=(i + rng.random()) * span / movements)
+                batch.append(InventoryMovement(
+                    item_id=item_id, movement_type=movement_type, quantity=quantity,
+                    moved_by_id=rng.choice(user_ids) if rng.random() < 0.9 else None,
+                    movement_date=moment, updated_at=moment,
+                    project=f"P-{rng.randint(1, 40):03d}" if rng.random() < 0.5 else None,
+                ))
+            InventoryMovement.objects.bulk_create(batch)
+            log(f"{offset + len(batch)} / {movements} movimientos")
+    counts['movements'] = movements
+
+    for offset in range(0, purchases, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, purchases)):
+            item = item_objects[rng.randrange(len(item_objects))]
+            supplier = item.supplier if item.supplier and rng.random() < 0.7 else (rng.choice(suppliers) if suppliers else None)
+            batch.append(PurchaseRecord(
+                item_id=item.pk, supplier=supplier,
+                purchase_date=(start + timedelta(seconds=(i + rng.random()) * span / purchases)).date(),
+                unit_price=_decimal(float(item.purchase_price) * rng.uniform(0.8, 1.2)),
+                quantity_purchased=_decimal(rng.randint(1, 100)),
+                recorded_by_id=rng.choice(user_ids),
+            ))
+        PurchaseRecord.objects.bulk_create(batch)
+        log(f"{offset + len(batch)} / {purchases} compras")
+    counts['purchases'] = purchases
+
+    # Stock final = inicial + neto de los movimientos; ~5 % de los ítems con stock bajo
+    for item in item_objects:
+        item.quantity += net[item.pk]
+        if rng.random() < 0.05:
+            item.low_stock_threshold = max(item.quantity, Decimal('0')) + 10
+    InventoryItem.objects.bulk_update(item_objects, ['quantity', 'low_stock_threshold'], batch_size=batch_size)
+
+    log("Reconstruyendo saldos diarios, estadísticas de precios e índice de búsqueda")
+    counts['daily_balances'] = rebuild_daily_balances()
+    counts['price_stats'] = rebuild_price_stats()
+    rebuild_search_index()
+
+    # bulk_create no dispara las señales que invalidan las cachés
+    bump_data_version()
+    for model in (UserProfile, Supplier, Category, Tag):
+        bump_reference_version(model)
+    return counts
@@ -1,29 +1,32 @@
 # backend/inventory/serializers.py
 
+from django.urls import reverse
 from rest_framework import serializers
-from .models import UserProfile, Supplier, Category, Tag, InventoryItem, InventoryMovement, Kit, KitItem, PurchaseRecord # <-- Importar PurchaseRecord
+from .fieldsets import FieldsetSerializerMixin
+from .jobs import REPORT_JOB_FORMATS, REPORT_JOB_TYPES
+from .models import UserProfile, Supplier, Category, Tag, InventoryItem, InventoryMovement, Kit, KitItem, PurchaseRecord, PurchasePriceStats, ReportJob # <-- Importar PurchaseRecord
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = ['id', 'username', 'email', 'role']
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Supplier
         fields = '__all__'
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = '__all__'
 
-class InventoryItemSerializer(serializers.ModelSerializer):
+class InventoryItemSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     
@@ -40,11 +43,30 @@ class InventoryItemSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'is_low_stock', 'is_expiring_soon', 'is_expired'
         ]
         read_only_fields = ['created_at', 'updated_at']
-
+        # Columnas de .values() para la ruta rápida de listados (row_serializers.py);
+        # las anotaciones las agrega InventoryItem.objects.with_status()
+        values_sources = {
+            'is_low_stock': 'low_stock',
+            'is_expiring_soon': 'expiring_soon',
+            'is_expired': 'expired',
+        }
+        # ?expand=: el objeto relacionado en lugar de su id (ver fieldsets.py)
+        expandable_fields = {
+            'category': (CategorySerializer, {}),
+            'supplier': (SupplierSerializer, {}),
+            'tags': (TagSerializer, {'many': True}),
+        }
+
+    def validate_quantity(self, value):
+        # La cantidad inicial se indica al crear el ítem; después el stock solo cambia
+        # con movimientos, que son los que mantienen DailyStockBalance (snapshots.py)
+        if self.instance is not None and value != self.instance.quantity:
+            raise serializers.ValidationError("La cantidad solo puede modificarse registrando movimientos de inventario.")
+        return value
+
+    # Con InventoryItem.objects.with_status() estos valores vienen calculados de la base de datos
     def get_is_low_stock(self, obj):
-        if obj.low_stock_threshold is not None:
-            return obj.quantity <= obj.low_stock_threshold
-        return False
+        return obj.is_low_stock
 
     def get_is_expiring_soon(self, obj):
         return obj.is_expiring_soon
@@ -53,7 +75,7 @@ class InventoryItemSerializer(serializers.ModelSerializer):
         return obj.is_expired
 
 
-class InventoryMovementSerializer(serializers.ModelSerializer):
+class InventoryMovementSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     item_name = serializers.CharField(source='item.name', read_only=True)
     moved_by_username = serializers.CharField(source='moved_by.username', read_only=True)
 
@@ -64,15 +86,28 @@ class InventoryMovementSerializer(serializers.ModelSerializer):
             'moved_by', 'moved_by_username', 'movement_date', 'project', 'notes'
         ]
         read_only_fields = ['movement_date']
+        expandable_fields = {'moved_by': (UserProfileSerializer, {})}
+
+
+class BulkInventoryMovementSerializer(serializers.ModelSerializer):
+    """
+    Valida una fila de carga masiva de movimientos. El ítem se recibe como id
+    y su existencia se comprueba para todas las filas en una sola consulta.
+    """
+    item = serializers.IntegerField(source='item_id')
+
+    class Meta:
+        model = InventoryMovement
+        fields = ['item', 'movement_type', 'quantity', 'project', 'notes']
 
 
-class KitItemSerializer(serializers.ModelSerializer):
+class KitItemSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     item_name = serializers.CharField(source='item.name', read_only=True)
     class Meta:
         model = KitItem
         fields = ['id', 'kit', 'item', 'item_name', 'quantity']
 
-class KitSerializer(serializers.ModelSerializer):
+class KitSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     items = KitItemSerializer(source='kititem_set', many=True, read_only=True)
 
     class Meta:
@@ -80,8 +115,17 @@ class KitSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'items']
 
 
+class KitAssemblySerializer(serializers.Serializer):
+    """
+    Parámetros de las acciones assemble/disassemble de un kit.
+    """
+    units = serializers.IntegerField(min_value=1)
+    project = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
 # --- NUEVO SERIALIZER: PurchaseRecordSerializer ---
-class PurchaseRecordSerializer(serializers.ModelSerializer):
+class PurchaseRecordSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     item_name = serializers.CharField(source='item.name', read_only=True) # Mostrar nombre del ítem
     supplier_name = serializers.CharField(source='supplier.name', read_only=True) # Mostrar nombre del proveedor
     recorded_by_username = serializers.CharField(source='recorded_by.username', read_only=True) # Mostrar nombre del usuario que registró
@@ -94,3 +138,95 @@ class PurchaseRecordSerializer(serializers.ModelSerializer):
             'recorded_by', 'recorded_by_username'
         ]
         read_only_fields = ['recorded_by'] # El usuario que registra se establecerá automáticamente
+        expandable_fields = {
+            'supplier': (SupplierSerializer, {}),
+            'recorded_by': (UserProfileSerializer, {}),
+        }
+
+
+class PurchasePriceStatsSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
+    item_name = serializers.CharField(source='item.name', read_only=True)
+    supplier_name = serializers.CharField(source='supplier.name', read_only=True, default=None)
+
+    class Meta:
+        model = PurchasePriceStats
+        fields = [
+            'id', 'item', 'item_name', 'supplier', 'supplier_name', 'purchase_count',
+            'total_quantity', 'avg_unit_cost', 'min_price', 'max_price', 'last_price',
+            'last_purchase_date', 'moving_avg_90d', 'updated_at'
+        ]
+        expandable_fields = {'supplier': (SupplierSerializer, {})}
+
+
+class ValuationRowSerializer(serializers.Serializer):
+    """
+    Fila del reporte de valorización (valuation.py). Cantidades y montos salen como
+    texto, igual que los DecimalField de los demás serializers de la API.
+    """
+    item = serializers.IntegerField()
+    item_name = serializers.CharField()
+    category_name = serializers.CharField(allow_null=True)
+    supplier_name = serializers.CharField(allow_null=True)
+    quantity = serializers.DecimalField(max_digits=None, decimal_places=2)
+    unit_cost = serializers.DecimalField(max_digits=None, decimal_places=4, allow_null=True)
+    value = serializers.DecimalField(max_digits=None, decimal_places=2)
+    unvalued_quantity = serializers.DecimalField(max_digits=None, decimal_places=2)
+
+
+class CategoryValuationSerializer(serializers.Serializer):
+    category_name = serializers.CharField(allow_null=True)
+    quantity = serializers.DecimalField(max_digits=None, decimal_places=2)
+    value = serializers.DecimalField(max_digits=None, decimal_places=2)
+
+
+class SupplierValuationSerializer(serializers.Serializer):
+    supplier_name = serializers.CharField(allow_null=True)
+    quantity = serializers.DecimalField(max_digits=None, decimal_places=2)
+    value = serializers.DecimalField(max_digits=None, decimal_places=2)
+
+
+class InventoryValuationSerializer(serializers.Serializer):
+    method = serializers.CharField()
+    total_value = serializers.DecimalField(max_digits=None, decimal_places=2)
+    items = ValuationRowSerializer(many=True)
+    by_category = CategoryValuationSerializer(many=True)
+    by_supplier = SupplierValuationSerializer(many=True)
+
+
+class ReportJobSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
+    requested_by_username = serializers.CharField(source='requested_by.username', read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'report_type', 'report_format', 'params', 'status',
+            'requested_by', 'requested_by_username', 'content_type', 'size', 'error',
+            'created_at', 'started_at', 'finished_at', 'expires_at', 'download_url'
+        ]
+        read_only_fields = [
+            'status', 'requested_by', 'content_type', 'size', 'error',
+            'created_at', 'started_at', 'finished_at', 'expires_at'
+        ]
+
+    def validate_report_type(self, value):
+        if value not in REPORT_JOB_TYPES:
+            raise serializers.ValidationError("Tipo de reporte inválido.")
+        return value
+
+    def validate_report_format(self, value):
+        if value not in REPORT_JOB_FORMATS:
+            raise serializers.ValidationError(f"Formato no soportado. Use uno de: {', '.join(REPORT_JOB_FORMATS)}.")
+        return value
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Los parámetros deben ser un objeto.")
+        return value
+
+    def get_download_url(self, obj):
+        if obj.status != 'COMPLETADO':
+            return None
+        request = self.context.get('request')
+        url = reverse('reportjob-download', args=[obj.pk])
+        return request.build_absolute_uri(url) if request else url
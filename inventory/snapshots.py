@@ -0,0 +1,195 @@
+# backend/inventory/snapshots.py
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyStockBalance, InventoryItem, InventoryMovement
+from .stock import MOVEMENT_SIGNS
+
+
+def record_daily_deltas(deltas):
+    """
+    Mantiene DailyStockBalance a partir de variaciones {(item_id, fecha): delta}.
+
+    Debe llamarse después de actualizar InventoryItem.quantity y dentro de la misma
+    transacción: la fila del ítem ya está bloqueada por el UPDATE, así que dos
+    transacciones nunca mantienen a la vez los saldos del mismo ítem.
+    Para movimientos de hoy (el caso normal) cuesta una o dos consultas; si se
+    edita un movimiento antiguo, también se corrigen los cierres de los días posteriores.
+    """
+    for (item_id, day), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+
+        balances = DailyStockBalance.objects.filter(item_id=item_id)
+        balances.filter(date__gt=day).update(closing_quantity=F('closing_quantity') + delta)
+
+        updated = balances.filter(date=day).update(
+            closing_quantity=F('closing_quantity') + delta,
+            net_change=F('net_change') + delta,
+        )
+        if updated:
+            continue
+
+        previous = balances.filter(date__lt=day).order_by('-date').values_list('closing_quantity', flat=True).first()
+        if previous is None:
+            # Sin saldo anterior: se deduce del stock actual (que ya incluye delta)
+            # descontando lo ocurrido en los días posteriores con saldo.
+            current = InventoryItem.objects.filter(pk=item_id).values_list('quantity', flat=True).first()
+            if current is None:
+                continue
+            later = balances.filter(date__gt=day).aggregate(total=Sum('net_change'))['total'] or 0
+            previous = current - delta - later
+
+        DailyStockBalance.objects.create(
+            item_id=item_id, date=day, closing_quantity=previous + delta, net_change=delta
+        )
+
+
+def day_bounds(day):
+    """
+    Inicio y fin (exclusivo) del día local `day` como datetimes conscientes. Filtrar
+    con movement_date__gte=inicio, movement_date__lt=fin usa el índice de la
+    columna, a diferencia de movement_date__date, que la envuelve en una conversión.
+    """
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+def _signed_sum(rows):
+    """
+    Convierte filas {'movement_type', 'total'} (ya agrupadas) en una variación con signo.
+    """
+    total = Decimal('0')
+    for row in rows:
+        total += (row['total'] or 0) * MOVEMENT_SIGNS.get(row['movement_type'], 0)
+    return total
+
+
+def parse_as_of(value):
+    """
+    Acepta 'YYYY-MM-DD' (se interpreta como el cierre de ese día) o un datetime ISO.
+    Devuelve (fecha_local, datetime_consciente_o_None). Lanza ValueError si no es válido.
+    """
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date(), None
+    except ValueError:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return timezone.localdate(moment), moment
+
+
+def stock_as_of(day, moment=None, item_ids=None):
+    """
+    Devuelve {item_id: cantidad} a la fecha indicada (cierre del día, o hasta
+    `moment` si se indica una hora).
+
+    Se parte del saldo del último día con cierre anterior a `day` y se suman solo
+    los movimientos de ese día, por lo que el costo no depende del historial completo.
+    """
+    items = InventoryItem.objects.all()
+    if item_ids is not None:
+        items = items.filter(pk__in=item_ids)
+
+    balances = DailyStockBalance.objects.filter(item=OuterRef('pk'))
+    items = items.annotate(
+        previous_closing=Subquery(
+            balances.filter(date__lt=day).order_by('-date').values('closing_quantity')[:1]
+        ),
+        # Apertura del primer día con saldo a partir de `day` (cierre - variación)
+        next_opening=Subquery(
+            balances.filter(date__gte=day).order_by('date')
+            .annotate(opening=F('closing_quantity') - F('net_change')).values('opening')[:1]
+        ),
+        day_closing=Subquery(balances.filter(date=day).values('closing_quantity')[:1]),
+    ).values_list('pk', 'quantity', 'previous_closing', 'next_opening', 'day_closing')
+
+    result = {}
+    pending = []
+    for item_id, quantity, previous_closing, next_opening, day_closing in items:
+        if moment is None and day_closing is not None:
+            result[item_id] = day_closing
+            continue
+        if previous_closing is not None:
+            opening = previous_closing
+        elif next_opening is not None:
+            opening = next_opening
+        else:
+            # Ítem sin movimientos registrados: su stock nunca ha cambiado
+            opening = quantity
+        result[item_id] = opening
+        if day_closing is not None:
+            pending.append(item_id)
+
+    if pending:
+        start, end = day_bounds(day)
+        if moment is not None:
+            end = min(end, moment + timedelta(microseconds=1))
+        movements = (
+            InventoryMovement.objects.filter(item_id__in=pending, movement_date__gte=start, movement_date__lt=end)
+            .order_by()
+            .values('item_id', 'movement_type')
+            .annotate(total=Sum('quantity'))
+        )
+        grouped = defaultdict(list)
+        for row in movements:
+            grouped[row['item_id']].append(row)
+        for item_id in pending:
+            result[item_id] += _signed_sum(grouped[item_id])
+
+    return {item_id: Decimal(quantity).quantize(Decimal('0.01')) for item_id, quantity in result.items()}
+
+
+def rebuild_daily_balances(item_ids=None, apps=None):
+    """
+    Reconstruye DailyStockBalance desde cero a partir de los movimientos.
+    Los saldos se calculan hacia atrás desde el stock actual, así el stock
+    inicial cargado sin movimientos queda reflejado correctamente.
+    `apps` es el registro de modelos históricos cuando se llama desde una
+    migración. Devuelve el número de saldos creados.
+    """
+    balance_model, item_model, movement_model = DailyStockBalance, InventoryItem, InventoryMovement
+    if apps is not None:
+        balance_model, item_model, movement_model = (
+            apps.get_model('inventory', name) for name in ('DailyStockBalance', 'InventoryItem', 'InventoryMovement')
+        )
+    items = item_model.objects.all()
+    movements = movement_model.objects.all()
+    if item_ids is not None:
+        items = items.filter(pk__in=item_ids)
+        movements = movements.filter(item_id__in=item_ids)
+
+    daily = defaultdict(lambda: defaultdict(Decimal))
+    rows = (
+        movements.order_by()
+        .annotate(day=TruncDate('movement_date', tzinfo=timezone.get_current_timezone()))
+        .values('item_id', 'day', 'movement_type')
+        .annotate(total=Sum('quantity'))
+    )
+    for row in rows:
+        daily[row['item_id']][row['day']] += (row['total'] or 0) * MOVEMENT_SIGNS.get(row['movement_type'], 0)
+
+    balances = []
+    for item_id, quantity in items.values_list('pk', 'quantity'):
+        closing = quantity
+        for day in sorted(daily.get(item_id, {}), reverse=True):
+            net_change = daily[item_id][day]
+            balances.append(balance_model(item_id=item_id, date=day, closing_quantity=closing, net_change=net_change))
+            closing -= net_change
+
+    with transaction.atomic():
+        existing = balance_model.objects.all()
+        if item_ids is not None:
+            existing = existing.filter(item_id__in=item_ids)
+        existing.delete()
+        balance_model.objects.bulk_create(balances, batch_size=1000)
+
+    return len(balances)
@@ -0,0 +1,156 @@
+# backend/inventory/stock.py
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Signo que cada tipo de movimiento aplica sobre el stock del ítem
+MOVEMENT_SIGNS = {
+    'ENTRADA': 1,
+    'DEVOLUCION': 1,
+    'SALIDA': -1,
+    'TRANSFERENCIA': -1,
+}
+
+
+class InsufficientStockError(Exception):
+    """
+    Se lanza cuando un movimiento dejaría el stock de un ítem en negativo
+    y el modo de rechazo de stock negativo está activo.
+    """
+    def __init__(self, item_id, delta, available=None):
+        self.item_id = item_id
+        self.delta = delta
+        self.available = available
+        super().__init__(
+            f"Stock insuficiente para el ítem {item_id}: se solicitan {-delta} unidades"
+            + (f", disponibles {available}." if available is not None else ".")
+        )
+
+
+def movement_delta(movement_type, quantity):
+    """
+    Devuelve la variación de stock (con signo) que produce un movimiento.
+    """
+    if movement_type is None or quantity is None:
+        return Decimal('0')
+    return Decimal(quantity) * MOVEMENT_SIGNS.get(movement_type, 0)
+
+
+def lock_enabled():
+    return getattr(settings, 'INVENTORY_STOCK_SELECT_FOR_UPDATE', False)
+
+
+def reject_negative_enabled():
+    return getattr(settings, 'INVENTORY_REJECT_NEGATIVE_STOCK', False)
+
+
+def apply_stock_deltas(deltas, lock=None, reject_negative=None):
+    """
+    Aplica un diccionario {item_id: delta} sobre InventoryItem.quantity.
+
+    La suma se hace en la base de datos (quantity = quantity + delta), por lo que
+    dos movimientos simultáneos sobre el mismo ítem nunca pierden una actualización.
+    Todo se ejecuta en una sola transacción; si algún ítem quedaría en negativo con
+    reject_negative activo, se lanza InsufficientStockError y no se aplica nada.
+
+    Los ítems se procesan ordenados por id para que los bloqueos de fila
+    (select_for_update) se tomen siempre en el mismo orden y no haya deadlocks.
+    """
+    # Import local para evitar el import circular con models.py
+    from .models import InventoryItem
+
+    if lock is None:
+        lock = lock_enabled()
+    if reject_negative is None:
+        reject_negative = reject_negative_enabled()
+
+    deltas = {item_id: delta for item_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    item_ids = sorted(deltas)
+    now = timezone.now()
+
+    with transaction.atomic():
+        if lock:
+            locked = dict(
+                InventoryItem.objects.select_for_update()
+                .filter(pk__in=item_ids)
+                .order_by('pk')
+                .values_list('pk', 'quantity')
+            )
+            if reject_negative:
+                for item_id in item_ids:
+                    available = locked.get(item_id)
+                    if available is not None and available + deltas[item_id] < 0:
+                        raise InsufficientStockError(item_id, deltas[item_id], available)
+
+        for item_id in item_ids:
+            delta = deltas[item_id]
+            queryset = InventoryItem.objects.filter(pk=item_id)
+            if reject_negative and delta < 0 and not lock:
+                # Update condicional: solo descuenta si hay stock suficiente
+                queryset = queryset.filter(quantity__gte=-delta)
+            updated = queryset.update(quantity=F('quantity') + delta, updated_at=now)
+            if not updated and reject_negative and delta < 0 and not lock:
+                available = (
+                    InventoryItem.objects.filter(pk=item_id)
+                    .values_list('quantity', flat=True)
+                    .first()
+                )
+                if available is not None:
+                    raise InsufficientStockError(item_id, delta, available)
+
+
+def apply_stock_delta(item_id, delta, lock=None, reject_negative=None):
+    """
+    Atajo de apply_stock_deltas para un único ítem.
+    """
+    apply_stock_deltas({item_id: delta}, lock=lock, reject_negative=reject_negative)
+
+
+def bulk_create_movements(movements, batch_size=1000, lock=None, reject_negative=None):
+    """
+    Inserta movimientos (instancias sin guardar) con bulk_create y actualiza el
+    stock una sola vez por ítem con la suma de sus variaciones.
+
+    bulk_create no dispara las señales pre_save/post_save, así que aquí se hace
+    explícitamente lo que harían las señales, pero agregado por item_id.
+    lock y reject_negative se pasan a apply_stock_deltas (por defecto, los settings).
+    Devuelve el diccionario de variaciones aplicadas {item_id: delta}.
+    """
+    from .models import InventoryMovement
+
+    with transaction.atomic():
+        InventoryMovement.objects.bulk_create(movements, batch_size=batch_size)
+
+        deltas = defaultdict(Decimal)
+        for movement in movements:
+            day = timezone.localdate(movement.movement_date)
+            deltas[(movement.item_id, day)] += movement_delta(movement.movement_type, movement.quantity)
+
+        return apply_movement_deltas(deltas, lock=lock, reject_negative=reject_negative)
+
+
+def apply_movement_deltas(deltas, lock=None, reject_negative=None):
+    """
+    Aplica variaciones indexadas por (item_id, fecha): actualiza el stock una vez
+    por ítem y mantiene los saldos diarios (DailyStockBalance) de cada fecha.
+    Devuelve las variaciones agregadas por ítem {item_id: delta}.
+    """
+    from .snapshots import record_daily_deltas
+
+    item_deltas = defaultdict(Decimal)
+    for (item_id, _day), delta in deltas.items():
+        item_deltas[item_id] += delta
+
+    with transaction.atomic():
+        apply_stock_deltas(item_deltas, lock=lock, reject_negative=reject_negative)
+        record_daily_deltas(deltas)
+
+    return dict(item_deltas)
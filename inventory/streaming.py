@@ -0,0 +1,38 @@
+# backend/inventory/streaming.py
+
+from .renderers import encode_json
+
+# Tamaño de bloque por defecto para recorrer querysets grandes con .iterator()
+STREAM_CHUNK_SIZE = 2000
+
+
+def iter_serialized(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Recorre el queryset por bloques y serializa cada fila con una única instancia
+    del serializer, sin materializar la lista completa en memoria.
+    """
+    serializer = serializer_class()
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(obj)
+
+
+def iter_ndjson(rows):
+    """
+    Un objeto JSON por línea (application/x-ndjson), ya codificado en UTF-8.
+    """
+    for row in rows:
+        yield encode_json(row) + b'\n'
+
+
+def iter_json_envelope(rows, **envelope):
+    """
+    Emite {"<envelope>..., "data": [filas]} fila a fila, con la misma forma que la
+    respuesta JSON no streaming de los reportes.
+    """
+    head = encode_json(envelope)
+    yield head[:-1] + (b',' if envelope else b'') + b'"data":['
+    first = True
+    for row in rows:
+        yield (b'' if first else b',') + encode_json(row)
+        first = False
+    yield b']}'
@@ -4,7 +4,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     UserProfileViewSet, SupplierViewSet, CategoryViewSet, TagViewSet,
-    InventoryItemViewSet, InventoryMovementViewSet, KitViewSet, PurchaseRecordViewSet # <-- Importar PurchaseRecordViewSet
+    InventoryItemViewSet, InventoryMovementViewSet, KitViewSet, PurchaseRecordViewSet, # <-- Importar PurchaseRecordViewSet
+    PurchasePriceStatsViewSet, ReportJobViewSet
 )
 from .reports_views import InventoryReportView
 
@@ -17,6 +18,8 @@ router.register(r'inventory', InventoryItemViewSet)
 router.register(r'movements', InventoryMovementViewSet)
 router.register(r'kits', KitViewSet)
 router.register(r'purchase-records', PurchaseRecordViewSet) # <-- NUEVA RUTA para Historial de Precios
+router.register(r'purchase-price-stats', PurchasePriceStatsViewSet) # Estadísticas de precios por ítem y proveedor
+router.register(r'report-jobs', ReportJobViewSet) # Reportes generados en segundo plano
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -0,0 +1,136 @@
+# backend/inventory/valuation.py
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import F, Sum, Window
+
+from .models import InventoryItem, PurchasePriceStats, PurchaseRecord
+
+VALUATION_METHODS = ('weighted_average', 'fifo')
+
+_CENT = Decimal('0.01')
+_ZERO = Decimal('0')
+
+
+def _weighted_average_costs():
+    """
+    {item_id: costo promedio ponderado}, leído de las estadísticas de precios ya
+    mantenidas (fila "todos los proveedores"): no se recorre el historial.
+    """
+    return dict(
+        PurchasePriceStats.objects.filter(supplier__isnull=True, avg_unit_cost__isnull=False)
+        .values_list('item_id', 'avg_unit_cost')
+    )
+
+
+def _fifo_layers():
+    """
+    Capas FIFO que siguen en stock, en una sola consulta. Con FIFO las salidas
+    consumen primero las compras más antiguas, así que el stock actual está
+    formado por las compras más recientes: una suma acumulada (función ventana)
+    de las cantidades compradas, de la más nueva a la más antigua, indica cuánto
+    de cada capa queda. Solo se devuelven las capas con algo en stock.
+    Devuelve filas (item_id, precio, cantidad_comprada, cantidad_de_capas_más_nuevas).
+    """
+    newer = Window(
+        Sum('quantity_purchased'),
+        partition_by=F('item_id'),
+        order_by=[F('purchase_date').desc(), F('id').desc()],
+    ) - F('quantity_purchased')
+    return (
+        PurchaseRecord.objects.filter(item__quantity__gt=0)
+        .annotate(newer_quantity=newer)
+        .filter(newer_quantity__lt=F('item__quantity'))
+        .values_list('item_id', 'unit_price', 'quantity_purchased', 'newer_quantity')
+        .order_by()
+    )
+
+
+def _fifo_costs(quantities):
+    """
+    {item_id: (valor de las capas en stock, cantidad cubierta por esas capas)}.
+    """
+    costs = defaultdict(lambda: [_ZERO, _ZERO])
+    for item_id, price, purchased, newer in _fifo_layers():
+        remaining = min(purchased, quantities[item_id] - newer)
+        costs[item_id][0] += remaining * price
+        costs[item_id][1] += remaining
+    return costs
+
+
+def inventory_valuation(method='weighted_average'):
+    """
+    Valoriza el stock actual de todo el catálogo por ítem, categoría y proveedor.
+
+    weighted_average: cantidad x costo promedio ponderado de las compras.
+    fifo: valor de las capas de compra que siguen en stock (ver _fifo_layers).
+    En ambos casos el stock que no tiene compras que lo respalden (p. ej. un
+    inventario inicial cargado como ENTRADA) se valoriza con InventoryItem.purchase_price;
+    si tampoco existe, se informa como cantidad sin costo.
+    Son dos o tres consultas en total, sin consultas por ítem.
+    """
+    if method not in VALUATION_METHODS:
+        raise ValueError(method)
+
+    items = list(
+        InventoryItem.objects.order_by('name', 'pk').values_list(
+            'pk', 'name', 'quantity', 'purchase_price', 'category__name', 'supplier__name'
+        )
+    )
+    quantities = {pk: quantity for pk, _, quantity, *_ in items}
+    average_costs = _weighted_average_costs()
+    fifo_costs = _fifo_costs(quantities) if method == 'fifo' else {}
+
+    rows = []
+    by_category = defaultdict(lambda: [_ZERO, _ZERO])
+    by_supplier = defaultdict(lambda: [_ZERO, _ZERO])
+    total = _ZERO
+    for pk, name, quantity, purchase_price, category, supplier in items:
+        quantity = max(quantity, _ZERO)
+        if method == 'fifo':
+            value, covered = fifo_costs.get(pk, (_ZERO, _ZERO))
+            fallback_price = purchase_price if purchase_price is not None else average_costs.get(pk)
+        else:
+            average = average_costs.get(pk)
+            value, covered = (quantity * average, quantity) if average is not None else (_ZERO, _ZERO)
+            fallback_price = purchase_price
+
+        uncovered = quantity - covered
+        unvalued = _ZERO
+        if uncovered > 0:
+            if fallback_price is not None:
+                value += uncovered * fallback_price
+            else:
+                unvalued = uncovered
+
+        value = value.quantize(_CENT)
+        valued_quantity = quantity - unvalued
+        rows.append({
+            'item': pk,
+            'item_name': name,
+            'category_name': category,
+            'supplier_name': supplier,
+            'quantity': quantity,
+            'unit_cost': (value / valued_quantity).quantize(Decimal('0.0001')) if valued_quantity else None,
+            'value': value,
+            'unvalued_quantity': unvalued,
+        })
+        for group, key in ((by_category, category), (by_supplier, supplier)):
+            group[key][0] += quantity
+            group[key][1] += value
+        total += value
+
+    def summary(group, label):
+        return [
+            {label: key, 'quantity': quantity, 'value': value}
+            for key, (quantity, value) in sorted(group.items(), key=lambda entry: (entry[0] is None, entry[0] or ''))
+        ]
+
+    return {
+        'method': method,
+        'total_value': total,
+        'items': rows,
+        'by_category': summary(by_category, 'category_name'),
+        'by_supplier': summary(by_supplier, 'supplier_name'),
+    }
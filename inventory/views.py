@@ -1,13 +1,33 @@
 # backend/inventory/views.py
 
-from rest_framework import viewsets
+import os
+
+from django.db.models import Prefetch
+from django.http import FileResponse
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
-from .models import UserProfile, Supplier, Category, Tag, InventoryItem, InventoryMovement, Kit, PurchaseRecord
+from .models import UserProfile, Supplier, Category, Tag, InventoryItem, InventoryMovement, Kit, KitItem, PurchaseRecord, PurchasePriceStats, ReportJob
 from .serializers import (
     UserProfileSerializer, SupplierSerializer, CategorySerializer, TagSerializer,
-    InventoryItemSerializer, InventoryMovementSerializer, KitSerializer, PurchaseRecordSerializer
+    InventoryItemSerializer, InventoryMovementSerializer, KitSerializer, PurchaseRecordSerializer,
+    KitAssemblySerializer, PurchasePriceStatsSerializer, ReportJobSerializer
 )
+from .authentication import CachedTokenAuthentication
+from .conditional import ConditionalGetMixin
+from .fieldsets import FieldsetViewMixin
+from .response_cache import ReferenceCacheMixin
+from .row_serializers import RowListMixin
+from .kits import assemble_kit, kit_availability
+from .filters import QueryFilter, date_filter, day_end, day_start, decimal_filter, text_filter
+from .pagination import InventoryMovementPagination, PurchaseRecordPagination
+from .stock import InsufficientStockError
+from .bulk import ingest_movements
+from .snapshots import parse_as_of, stock_as_of
+from .search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_item_ids
+from .jobs import artifact_path, create_report_job
 from .permissions import (
     IsAdminOrGestorInventario,       # <-- CORREGIDO: Usar el nombre correcto
     IsAdminOrGestorInventarioOrLogistica, # <-- CORREGIDO: Usar el nombre correcto
@@ -15,71 +35,348 @@ from .permissions import (
     # IsAuthenticatedAndAssignedRole # Este permiso está comentado en permissions.py, no lo importamos directamente aquí a menos que se use.
 )
 
-class UserProfileViewSet(viewsets.ModelViewSet):
-    queryset = UserProfile.objects.all()
+def parse_bool_param(params, name):
+    """
+    Lee un parámetro booleano de la query (true/false). Devuelve None si no viene.
+    """
+    value = params.get(name)
+    if value is None:
+        return None
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise ValidationError({name: ["Use 'true' o 'false'."]})
+
+
+class UserProfileViewSet(ReferenceCacheMixin, FieldsetViewMixin, viewsets.ModelViewSet):
+    queryset = UserProfile.objects.order_by('username')
     serializer_class = UserProfileSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAdminOrReadOnly] # Solo admin puede crear/editar usuarios
+    query_filters = {'role': text_filter('role')}
+    ordering_fields = ('username',)
+    cache_vary_on_role = True # El listado incluye correos: no se comparte entre roles
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(ReferenceCacheMixin, FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     # CORREGIDO: Reemplazado IsAdminOrComprador por IsAdminOrGestorInventario para este ejemplo
     # Si tienes un permiso 'IsAdminOrComprador' definido, asegúrate de importarlo y usarlo.
     # Por ahora, usaré IsAdminOrGestorInventario para que compile.
     permission_classes = [IsAdminOrGestorInventario] 
+    ordering_fields = ('name',)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReferenceCacheMixin, FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAdminOrGestorInventario] # Gestor de Inv o Admin pueden gestionar categorías
+    ordering_fields = ('name',)
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ReferenceCacheMixin, FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAdminOrGestorInventario] # Gestor de Inv o Admin pueden gestionar etiquetas
+    ordering_fields = ('name',)
 
-class InventoryItemViewSet(viewsets.ModelViewSet):
-    queryset = InventoryItem.objects.all()
+class InventoryItemViewSet(ConditionalGetMixin, FieldsetViewMixin, RowListMixin, viewsets.ModelViewSet):
+    queryset = InventoryItem.objects.select_related('category', 'supplier').prefetch_related('tags')
+    watermark_field = 'updated_at' # ETag / Last-Modified (ver conditional.py)
     serializer_class = InventoryItemSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAdminOrGestorInventario] # Gestor de Inv o Admin pueden gestionar ítems
+    query_filters = {
+        'category': QueryFilter('category_id'),
+        'supplier': QueryFilter('supplier_id'),
+        'tag': QueryFilter('tags'),
+        'location': text_filter('location'),
+        'min_quantity': decimal_filter('quantity__gte'),
+        'max_quantity': decimal_filter('quantity__lte'),
+        'expiration_from': date_filter('expiration_date__gte'),
+        'expiration_to': date_filter('expiration_date__lte'),
+    }
+    ordering_fields = ('name', 'quantity', 'expiration_date')
+    ordering = ('name',)
+    fieldset_actions = ('list', 'retrieve', 'search')
+
+    def get_queryset(self):
+        """
+        Filtros por estado, evaluados en la base de datos:
+        ?low_stock=true|false, ?expired=true|false, ?expiring_within=<días>.
+        """
+        queryset = super().get_queryset().with_status()
+        params = self.request.query_params
+
+        low_stock = parse_bool_param(params, 'low_stock')
+        if low_stock is not None:
+            queryset = queryset.low_stock(low_stock)
+
+        expired = parse_bool_param(params, 'expired')
+        if expired is not None:
+            queryset = queryset.expired(expired)
+
+        expiring_within = params.get('expiring_within')
+        if expiring_within is not None:
+            try:
+                days = int(expiring_within)
+                if days < 0:
+                    raise ValueError(days)
+            except ValueError:
+                raise ValidationError({'expiring_within': ["Debe ser un número entero de días mayor o igual a 0."]})
+            queryset = queryset.expiring_within(days)
+
+        return queryset
 
-class InventoryMovementViewSet(viewsets.ModelViewSet):
-    queryset = InventoryMovement.objects.all()
+    @action(detail=True, methods=['get'], url_path='stock-as-of')
+    def stock_as_of(self, request, pk=None):
+        """
+        Cantidad del ítem a una fecha (?date=YYYY-MM-DD) o a un instante (?date=ISO 8601),
+        calculada desde el saldo diario más cercano más los movimientos de ese día.
+        """
+        item = self.get_object()
+        as_of_str = request.query_params.get('date')
+        if not as_of_str:
+            return Response({"error": "Debe indicar el parámetro 'date'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            as_of_day, as_of_moment = parse_as_of(as_of_str)
+        except ValueError:
+            return Response({"error": "Formato de fecha inválido. Use YYYY-MM-DD o fecha y hora ISO."}, status=status.HTTP_400_BAD_REQUEST)
+
+        quantity = stock_as_of(as_of_day, as_of_moment, item_ids=[item.pk])[item.pk]
+        return Response({'item': item.pk, 'item_name': item.name, 'as_of': as_of_str, 'quantity': quantity})
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Búsqueda de texto en nombre, N° de serie, ubicación y descripción (?q=),
+        por prefijo y ordenada por relevancia, usando el índice de texto del motor.
+        Devuelve hasta ?limit= resultados (máx. 100); los filtros de estado del
+        listado (?low_stock, ?expired, ?expiring_within) se aplican antes del límite.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "Debe indicar el parámetro 'q'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+            if limit < 1:
+                raise ValueError(limit)
+        except ValueError:
+            return Response({"error": "El límite debe ser un entero mayor que 0."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        filtered = any(name in request.query_params for name in ('low_stock', 'expired', 'expiring_within'))
+        ids = search_item_ids(query, limit, candidates=queryset if filtered else None)
+        queryset = queryset.filter(pk__in=ids)
+        rows = self.get_row_serializer()
+        if rows is not None:
+            values = list(rows.values(queryset, ['pk']))
+            found = dict(zip((row['pk'] for row in values), rows.serialize(values)))
+        else:
+            items = list(queryset)
+            found = dict(zip((item.pk for item in items), self.get_serializer(items, many=True).data))
+        ranked = [found[pk] for pk in ids if pk in found]
+        return Response({
+            'query': query,
+            'count': len(ranked),
+            'results': ranked,
+        })
+
+class InventoryMovementViewSet(ConditionalGetMixin, FieldsetViewMixin, RowListMixin, viewsets.ModelViewSet):
+    queryset = InventoryMovement.objects.select_related('item', 'moved_by')
+    watermark_field = 'updated_at' # ETag / Last-Modified (ver conditional.py)
     serializer_class = InventoryMovementSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAdminOrGestorInventarioOrLogistica] # Logística o Admin pueden gestionar movimientos
+    pagination_class = InventoryMovementPagination # Cursor sobre (-movement_date, -id), sin COUNT(*) ni OFFSET
+    query_filters = {
+        'item': QueryFilter('item_id'),
+        'movement_type': text_filter('movement_type'),
+        'project': text_filter('project'),
+        'moved_by': QueryFilter('moved_by_id'),
+        'start_date': date_filter('movement_date__gte', day_start),
+        'end_date': date_filter('movement_date__lt', day_end),
+    }
+    ordering_fields = ('movement_date',)
 
     def perform_create(self, serializer):
         # Establecer automáticamente el usuario que realiza el movimiento
-        serializer.save(moved_by=self.request.user)
+        try:
+            serializer.save(moved_by=self.request.user)
+        except InsufficientStockError as e:
+            raise ValidationError({'quantity': [str(e)]})
 
     def perform_update(self, serializer):
         # Cuando se actualiza un movimiento, el 'moved_by' debería ser el que lo actualiza
-        serializer.save(moved_by=self.request.user)
+        try:
+            serializer.save(moved_by=self.request.user)
+        except InsufficientStockError as e:
+            raise ValidationError({'quantity': [str(e)]})
+
+    def perform_destroy(self, instance):
+        try:
+            instance.delete()
+        except InsufficientStockError as e:
+            raise ValidationError({'quantity': [str(e)]})
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Carga masiva de movimientos: recibe una lista de movimientos, los inserta
+        con bulk_create y actualiza el stock una sola vez por ítem.
+        Con ?partial=true se insertan las filas válidas aunque otras tengan errores.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({"error": "Se esperaba una lista de movimientos."}, status=status.HTTP_400_BAD_REQUEST)
+
+        partial = request.query_params.get('partial', 'false').lower() == 'true'
+        try:
+            result = ingest_movements(rows, moved_by=request.user, partial=partial)
+        except InsufficientStockError as e:
+            return Response({"error": str(e), 'item': e.item_id}, status=status.HTTP_400_BAD_REQUEST)
 
+        if result['errors'] and not result['created']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
 
-class KitViewSet(viewsets.ModelViewSet):
-    queryset = Kit.objects.all()
+
+class KitViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
+    queryset = Kit.objects.prefetch_related(
+        Prefetch('kititem_set', queryset=KitItem.objects.select_related('item'))
+    )
     serializer_class = KitSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAdminOrGestorInventario] # Gestor de Inv o Admin pueden gestionar kits
+    ordering_fields = ('name',)
+
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        """
+        Cuántas unidades de cada kit se pueden armar con el stock actual, el
+        componente limitante y el faltante por componente. Con ?quantity=N el
+        faltante se calcula para armar N unidades (por defecto, una más de las posibles).
+        """
+        target = request.query_params.get('quantity')
+        if target is not None:
+            try:
+                target = int(target)
+                if target < 1:
+                    raise ValueError(target)
+            except ValueError:
+                return Response({"error": "La cantidad debe ser un entero mayor que 0."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(kit_availability(target))
+
+    def run_kit_operation(self, request, operation):
+        kit = self.get_object()
+        serializer = KitAssemblySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            summary = assemble_kit(kit, operation=operation, moved_by=request.user, **serializer.validated_data)
+        except InsufficientStockError as e:
+            return Response({"error": str(e), 'item': e.item_id}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def assemble(self, request, pk=None):
+        """
+        Arma N unidades del kit: registra una SALIDA por componente en una sola
+        transacción, validando el stock de todos los componentes con bloqueo de filas.
+        """
+        return self.run_kit_operation(request, 'assemble')
+
+    @action(detail=True, methods=['post'])
+    def disassemble(self, request, pk=None):
+        """
+        Desarma N unidades del kit: devuelve los componentes al stock (DEVOLUCION).
+        """
+        return self.run_kit_operation(request, 'disassemble')
 
 
 # --- NUEVO VIEWSET: PurchaseRecordViewSet ---
-class PurchaseRecordViewSet(viewsets.ModelViewSet):
-    queryset = PurchaseRecord.objects.all()
+class PurchaseRecordViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
+    queryset = PurchaseRecord.objects.select_related('item', 'supplier', 'recorded_by')
     serializer_class = PurchaseRecordSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     # Solo ADMIN o COMPRADOR pueden registrar/ver historial de compras
     # CORREGIDO: Reemplazado IsAdminOrComprador por IsAdminOrGestorInventario por simplicidad para que compile.
     # Si tienes un permiso 'IsAdminOrComprador' definido, asegúrate de importarlo y usarlo.
     permission_classes = [IsAdminOrGestorInventario] 
+    pagination_class = PurchaseRecordPagination # Cursor sobre (-purchase_date, -id)
+    query_filters = {
+        'item': QueryFilter('item_id'),
+        'supplier': QueryFilter('supplier_id'),
+        'start_date': date_filter('purchase_date__gte'),
+        'end_date': date_filter('purchase_date__lte'),
+    }
+    ordering_fields = ('purchase_date',)
 
     def perform_create(self, serializer):
         # Establecer automáticamente el usuario que registra la compra
         serializer.save(recorded_by=self.request.user)
+
+
+class PurchasePriceStatsViewSet(FieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Estadísticas de precios de compra ya calculadas (lectura O(1) por ítem).
+    ?item=<id> filtra por ítem; ?supplier=<id> por proveedor y ?supplier=all
+    devuelve solo las filas que agregan todos los proveedores.
+    """
+    queryset = PurchasePriceStats.objects.select_related('item', 'supplier')
+    serializer_class = PurchasePriceStatsSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminOrGestorInventario]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        try:
+            if params.get('item'):
+                queryset = queryset.filter(item_id=int(params['item']))
+            supplier = params.get('supplier')
+            if supplier == 'all':
+                queryset = queryset.filter(supplier__isnull=True)
+            elif supplier:
+                queryset = queryset.filter(supplier_id=int(supplier))
+        except ValueError:
+            raise ValidationError({"error": "Los filtros item y supplier deben ser ids numéricos."})
+        return queryset
+
+
+class ReportJobViewSet(FieldsetViewMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Reportes generados en segundo plano: POST crea el trabajo, GET consulta su
+    estado y /download/ entrega el archivo cuando está COMPLETADO.
+    """
+    queryset = ReportJob.objects.select_related('requested_by')
+    serializer_class = ReportJobSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Cada usuario ve solo sus reportes; el administrador ve todos
+        if self.request.user.role != 'ADMIN':
+            queryset = queryset.filter(requested_by=self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        serializer.instance = create_report_job(
+            self.request.user, data['report_type'], data.get('report_format', 'pdf'), data.get('params')
+        )
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != 'COMPLETADO':
+            return Response({"error": f"El reporte no está disponible (estado: {job.get_status_display()})."}, status=status.HTTP_409_CONFLICT)
+
+        path = artifact_path(job)
+        if not os.path.exists(path):
+            return Response({"error": "El archivo del reporte ya no existe."}, status=status.HTTP_410_GONE)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=job.artifact, content_type=job.content_type or None)
@@ -86,6 +86,11 @@ DATABASES = {
     )
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Base de pruebas en archivo (no en memoria) para que los tests con varios
+    # hilos puedan escribir de forma concurrente esperando el bloqueo de SQLite.
+    DATABASES['default']['TEST'] = {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -132,15 +137,90 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Configuración de Django Rest Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'inventory.authentication.CachedTokenAuthentication', # TokenAuthentication con caché
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', # Por defecto, requiere autenticación
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        # Misma salida que JSONRenderer, con orjson si está instalado (inventory/renderers.py)
+        'inventory.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_FILTER_BACKENDS': [
+        # Filtros y ?ordering= declarados en cada vista (query_filters / ordering_fields)
+        'inventory.filters.QueryParamFilterBackend',
+        'inventory.filters.IndexedOrderingFilter',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10 # Número de ítems por página
 }
 
+# Configuración del motor de stock (inventory/stock.py)
+# Bloquear las filas de InventoryItem (SELECT ... FOR UPDATE) al aplicar movimientos
+INVENTORY_STOCK_SELECT_FOR_UPDATE = os.environ.get('INVENTORY_STOCK_SELECT_FOR_UPDATE', 'False') == 'True'
+# Rechazar movimientos que dejarían el stock de un ítem en negativo
+INVENTORY_REJECT_NEGATIVE_STOCK = os.environ.get('INVENTORY_REJECT_NEGATIVE_STOCK', 'False') == 'True'
+
+# Reportes en segundo plano (inventory/jobs.py)
+# 'thread': un pool de hilos dentro del proceso web genera los reportes.
+# 'command': los trabajos quedan pendientes y los procesa `manage.py run_report_worker`.
+REPORT_JOBS_MODE = os.environ.get('REPORT_JOBS_MODE', 'thread')
+REPORT_JOBS_WORKERS = int(os.environ.get('REPORT_JOBS_WORKERS', '2'))
+REPORT_JOBS_DIR = os.environ.get('REPORT_JOBS_DIR', os.path.join(BASE_DIR, 'report_artifacts'))
+REPORT_JOBS_TTL_HOURS = int(os.environ.get('REPORT_JOBS_TTL_HOURS', '24'))
+# Minutos tras los que un trabajo EN_PROCESO se da por interrumpido (worker caído)
+REPORT_JOBS_STALE_MINUTES = int(os.environ.get('REPORT_JOBS_STALE_MINUTES', '30'))
+
+# Caché de reportes (inventory/report_cache.py). Usa el backend de caché 'default'
+# (locmem si no se configura CACHES). La versión de los datos se lee de la base de
+# datos, así que con una caché por proceso cada worker guarda su copia pero nunca
+# sirve una desactualizada; un backend compartido evita generar el reporte en cada proceso.
+REPORT_CACHE_TIMEOUT = int(os.environ.get('REPORT_CACHE_TIMEOUT', '3600'))
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', str(20 * 1024 * 1024)))
+
+# Caché de respuestas de categorías, etiquetas, proveedores y usuarios
+# (inventory/response_cache.py), invalidada por señales de cada modelo.
+# Backend intercambiable: locmem por defecto; p. ej. en local
+# REFERENCE_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# REFERENCE_CACHE_LOCATION=/tmp/maestranza_reference_cache, o Redis en producción.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reference': {
+        'BACKEND': os.environ.get('REFERENCE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('REFERENCE_CACHE_LOCATION', 'inventory-reference'),
+    },
+}
+REFERENCE_CACHE_ALIAS = 'reference'
+REFERENCE_CACHE_TIMEOUT = int(os.environ.get('REFERENCE_CACHE_TIMEOUT', '3600'))
+
+# Disponibilidad de kits (inventory/kits.py). El resultado se invalida solo con
+# cualquier movimiento de stock o cambio de composición; el timeout es un tope.
+KIT_AVAILABILITY_CACHE_TIMEOUT = int(os.environ.get('KIT_AVAILABILITY_CACHE_TIMEOUT', '300'))
+
+# Alertas de stock bajo y vencimiento (inventory/alerts.py)
+# Los movimientos solo encolan alertas (StockAlert); el envío se hace por lotes.
+# 'thread': un hilo en segundo plano envía los resúmenes al confirmarse la transacción.
+# 'command': los envía `manage.py dispatch_alerts`.
+INVENTORY_ALERTS_MODE = os.environ.get('INVENTORY_ALERTS_MODE', 'thread')
+# Clase con un método send(alerts); p. ej. 'inventory.alerts.ConsoleAlertSink'
+INVENTORY_ALERT_SINK = os.environ.get('INVENTORY_ALERT_SINK', 'inventory.alerts.LoggingAlertSink')
+
+# Caché de autenticación por token (inventory/authentication.py)
+# Segundos que se reutiliza un token ya resuelto con la caché compartida (0 la desactiva).
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', '60'))
+# Alias de CACHES compartido entre procesos (p. ej. Redis): la eliminación de un
+# token, la desactivación de un usuario o un cambio de rol se invalidan de inmediato
+# en todos los workers. Recomendado en producción con varios workers.
+AUTH_TOKEN_CACHE_ALIAS = os.environ.get('AUTH_TOKEN_CACHE_ALIAS') or None
+# Sin alias se usa una LRU en memoria de cada proceso con este TTL. Las señales la
+# invalidan solo en el proceso que hizo el cambio: en los demás, un token eliminado
+# o un usuario desactivado sigue aceptándose hasta estos segundos. 0 desactiva la caché.
+AUTH_TOKEN_CACHE_LOCAL_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_LOCAL_TTL', '30'))
+AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_TOKEN_CACHE_MAX_ENTRIES', '1024'))
+
 # Configuración del modelo de usuario personalizado
 AUTH_USER_MODEL = 'inventory.UserProfile'
 